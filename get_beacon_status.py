@@ -37,6 +37,7 @@ __version__ = '0.1'
 # Packages and Resources:
 #   wxPython        - http://www.wxpython.org/
 #   pyodbc          - https://github.com/mkleehammer/pyodbc
+#   NumPy           - http://www.numpy.org/ (optional, required for DF analysis)
 #   py2exe          - http://www.py2exe.org/
 #   Inno Setup      - http://www.jrsoftware.org/isinfo.php
 #   Resource Hacker - http://www.angusj.com/resourcehacker/
@@ -54,12 +55,38 @@ import wx.grid
 
 import pyodbc
 import logging
+import logging.handlers
+import Queue
 import os
+import re
+import sys
 
 import json
-
+import random
+import time
+import sqlite3
+import datetime
+import decimal
+import csv
+import struct
+import warnings
+import zlib
+
+import array
+import cStringIO
+import bisect
+import heapq
+import threading
+
+from collections import Counter, OrderedDict, deque, namedtuple
+from itertools import islice, izip
 from operator import itemgetter
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # -----------------------------------------------------------------------------
 # WORKING DIRECTORY
 # -----------------------------------------------------------------------------
@@ -70,7 +97,6 @@ try:
     dname = os.path.dirname(abspath)
     os.chdir(dname)
 except NameError:
-    import sys
     os.chdir(os.path.dirname(os.path.abspath(sys.argv[0])))
 
 
@@ -78,27 +104,99 @@ except NameError:
 # LOGGING SETUP
 # -----------------------------------------------------------------------------
 
-# Create logger
+class QueueHandler(logging.Handler):
+    """
+        Logging handler which puts records on a queue for a QueueListener,
+        so that the calling thread never waits on file or console output.
+    """
+
+    def __init__(self, queue):
+        logging.Handler.__init__(self)
+        self.queue = queue
+
+    def emit(self, record):
+        try:
+            # Format the message and any traceback now, the arguments may change
+            # before the listener writes the record
+            msg = self.format(record)
+            record.message = msg
+            record.msg = msg
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+class QueueListener(object):
+    """
+        Background thread which takes log records off the queue and passes
+        them to the output handlers.
+    """
+    sentinel = None
+
+    def __init__(self, queue, *handlers):
+        self.queue = queue
+        self.handlers = handlers
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.monitor, name="log-listener")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def monitor(self):
+        while 1:
+            record = self.queue.get()
+            if record is self.sentinel:
+                break
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def stop(self):
+        """
+            Writes out the queued records and stops the listener thread
+        """
+        if self.thread is not None:
+            self.queue.put_nowait(self.sentinel)
+            self.thread.join()
+            self.thread = None
+
+
+# Create logger, the logger level is the one set from the View menu so that
+# disabled log calls return straight away
 logger = logging.getLogger("beacon_status")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(logging.ERROR)
+logger.propagate = False
 
-# Create log file handler
-# log_fh = logging.FileHandler("beacon_status.log")
-# log_fh.setLevel(logging.ERROR)
+# Create rotating log file handler, the application directory may not be
+# writable so the file is optional
+try:
+    log_fh = logging.handlers.RotatingFileHandler("beacon_status.log", maxBytes=1024 * 1024, backupCount=3)
+except IOError:
+    log_fh = None
 
 # Create console handler with higher level
 log_ch = logging.StreamHandler()
 log_ch.setLevel(logging.ERROR)
 
 # Create formatter and add it to the handlers
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(threadName)s - %(levelname)s - %(message)s")
 formatter2 = logging.Formatter("%(name)-14s: %(levelname)-8s %(message)s")
-# log_fh.setFormatter(formatter)
 log_ch.setFormatter(formatter2)
 
-# Add the handlers to the logger
-# logger.addHandler(log_fh)
-logger.addHandler(log_ch)
+log_handlers = [log_ch]
+if log_fh is not None:
+    log_fh.setFormatter(formatter)
+    log_handlers.append(log_fh)
+
+# Log records are written by a listener thread, the logger only queues them
+log_queue = Queue.Queue()
+log_listener = QueueListener(log_queue, *log_handlers)
+logger.addHandler(QueueHandler(log_queue))
+log_listener.start()
 
 # -----------------------------------------------------------------------------
 # GLOBAL VARIABLES
@@ -113,6 +211,44 @@ SAVE_RESULTS = 3
 ABOUT_BOX = 4
 OPEN_FILE = 5
 QUICK_HELP = 6
+TAB_LIMIT = 7
+DF_ANALYSIS = 8
+USE_MIRROR = 9
+DIAGNOSTICS = 10
+GENEALOGY_QUERY = 11
+LOG_LEVEL_DEBUG = 12
+LOG_LEVEL_INFO = 13
+LOG_LEVEL_WARNING = 14
+LOG_LEVEL_ERROR = 15
+PRODUCTION_MONITOR = 16
+SEARCH_RECORDS = 17
+EXPORT_LOT = 18
+PREFETCH = 19
+
+# Log levels selectable from the View menu
+log_level_menu_ids = [(LOG_LEVEL_DEBUG, "Debug", logging.DEBUG), (LOG_LEVEL_INFO, "Info", logging.INFO),
+                      (LOG_LEVEL_WARNING, "Warning", logging.WARNING), (LOG_LEVEL_ERROR, "Error", logging.ERROR)]
+
+# DF value columns of the DFTestingTable
+df_channel_list = ["VL", "AL", "VX", "AX", "VY", "AY", "VN"]
+
+# Robust z-score above which a DF value is flagged as an outlier
+df_outlier_threshold = 3.5
+
+# Sub-assembly serial number columns of the assemblyKittingTable and the
+# labels used for them in genealogy results
+genealogy_link_columns = [("serialNumberDigital", "Digital Board"), ("serialNumberAnalog", "Analog Board")]
+genealogy_max_depth = 3
+
+# Maximum number of serial numbers in a single batched query
+batch_query_size = 1000
+
+# Maximum number of result pages kept as live widgets, least recently viewed
+# pages past this limit are replaced by a ResultsPlaceholder
+max_live_result_pages = 10
+
+# Interval for refreshing the memory usage shown in the status bar
+status_refresh_ms = 2000
 
 # Directory to the applications icon
 # app_icon = "icons\\BCALogoMedium.png"
@@ -123,289 +259,2565 @@ app_icon = "icons\\app_icon_radar.ico"
 sql_cnxn_str = "DRIVER={SQL Server};SERVER=172.18.149.5,2222;DATABASE=T3Production;UID=BCAUser;PWD=*trekkie#123;" \
                "Trusted_Connection=no"
 
+# Login and query timeouts for T3Production, in seconds
+db_login_timeout_s = 10
+db_query_timeout_s = 30
+
+# Retry and circuit breaker settings for T3Production calls, see DbAccess
+db_retry_attempts = 3
+db_retry_base_delay_s = 0.5
+db_retry_max_delay_s = 5.0
+db_breaker_failure_threshold = 5
+db_breaker_reset_s = 30
+
+# ODBC SQLSTATEs which are worth retrying (connection failures, timeouts and deadlocks)
+transient_sqlstates = ["08001", "08S01", "08007", "HYT00", "HYT01", "40001"]
+
+# Interval for loading new serial numbers into the serial number index and the
+# number of rows read from T3Production at a time while loading
+serial_index_refresh_s = 600
+serial_index_fetch_size = 10000
+
+# Predictive prefetch of the next serial numbers, see Prefetcher
+prefetch_depth = 3
+prefetch_max_step = 10
+prefetch_max_age_s = 120
+prefetch_max_queries_per_min = 20
+prefetch_delay_s = 0.5
+
+# Rows per row group and zlib level for columnar export files
+export_row_group_size = 5000
+export_compression_level = 6
+
+# Maximum number of results listed by the SearchDialog
+search_result_limit = 500
+
+# Production monitor window and polling limits, see ProductionMonitor
+monitor_window_hours = 8
+monitor_max_events = 100000
+monitor_min_poll_s = 5.0
+monitor_max_poll_s = 120.0
+monitor_refresh_ms = 2000
+
+# Number of beacons kept in the result cache, used to serve stale results when
+# T3Production is unavailable
+result_cache_size = 200
+
+# Compact record classes for each DB table, filled in the first time a table
+# is queried (see get_record_class())
+db_record_classes = {}
+
+# Optional local mirror of the manufacturing tables, see LocalMirror
+mirror_db_path = "beacon_mirror.db"
+mirror_lookup_tables = ["employeeTable", "failureModeTable"]
+mirror_sync_interval_s = 300
+mirror_sync_chunk_size = 5000
+local_mirror = None
+
+# Employee names and failure descriptions that have already been looked up
+employee_name_cache = {}
+failure_description_cache = {}
+
 
 # -----------------------------------------------------------------------------
-# CLASSES
+# DATABASE RECORDS
+# -----------------------------------------------------------------------------
+
+class BeaconRecord(object):
+    """
+        Base class for the compact per-table record types. Each DB table gets a
+        subclass whose __slots__ are the table's columns, with the table name
+        stored once on the class rather than once per row. Records can be used
+        like the dictionaries returned previously (record["failureCode"],
+        "db_table" in record, sorted(record), ...).
+    """
+    __slots__ = ()
+
+    db_table = None
+    fields = ()
+    field_set = frozenset()
+
+    def __init__(self, values):
+        for name, value in izip(self.fields, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        if key in self.field_set:
+            return getattr(self, key)
+        elif key == "db_table":
+            return self.db_table
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.field_set:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.field_set or key == "db_table"
+
+    def __iter__(self):
+        yield "db_table"
+        for name in self.fields:
+            yield name
+
+    def __len__(self):
+        return len(self.fields) + 1
+
+    def __repr__(self):
+        return "{0}({1})".format(self.__class__.__name__, self.to_dict())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def to_dict(self):
+        """
+            Returns a plain dictionary copy of the record, as used for the JSON
+            report files.
+        """
+        db_dict = {"db_table": self.db_table}
+        for name in self.fields:
+            db_dict[name] = getattr(self, name)
+        return db_dict
+
+
+# Render model for one entry of a ResultsPage. node is the RenderNode for the
+# entry's tree item and df_values the formatted DF values, or None if the entry
+# is not from the DFTestingTable. See build_render_entries().
+RenderEntry = namedtuple("RenderEntry", ["transaction_time", "node", "df_values", "entry"])
+
+# Tree item of a RenderEntry with its child items
+RenderNode = namedtuple("RenderNode", ["label", "children", "expanded"])
+
+# Rows returned for one DB table. The rows are ordered by transactionTime, source
+# is where the rows were read from and retrieved_at is when they were read from
+# T3Production (for the local mirror, the time of the last sync)
+TableResult = namedtuple("TableResult", ["db_table", "rows", "source", "retrieved_at"])
+
+
+class ColumnarTable(object):
+    """
+        Column-oriented container for bulk results from a single DB table. Each
+        column is stored as one list, so thousands of rows cost one list slot
+        per value instead of one object per row. Indexing or iterating the
+        table returns record objects for code that expects row access.
+    """
+
+    def __init__(self, record_class, rows=()):
+        self.record_class = record_class
+        self.db_table = record_class.db_table
+        self.fields = record_class.fields
+        self.columns = dict((name, []) for name in self.fields)
+
+        self.extend(rows)
+
+    def __len__(self):
+        if not self.fields:
+            return 0
+        return len(self.columns[self.fields[0]])
+
+    def __getitem__(self, index):
+        return self.record_class([self.columns[name][index] for name in self.fields])
+
+    def __iter__(self):
+        for index in xrange(len(self)):
+            yield self[index]
+
+    def append(self, row):
+        for name, value in izip(self.fields, row):
+            self.columns[name].append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def column(self, name):
+        """
+            Returns the list of values stored for the specified column
+        """
+        return self.columns[name]
+
+
+# -----------------------------------------------------------------------------
+# DATABASE ACCESS
+# -----------------------------------------------------------------------------
+
+class DbUnavailableError(pyodbc.Error):
+    """
+        Raised without contacting T3Production while the circuit breaker is
+        open
+    """
+    pass
+
+
+class CircuitBreaker(object):
+    """
+        Circuit breaker for the T3Production connection. After
+        failure_threshold consecutive failed calls the breaker opens and calls
+        fail immediately for reset_s seconds. A single trial call is then let
+        through (half-open), closing the breaker again if it succeeds.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold, reset_s):
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.lock = threading.Lock()
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def allow(self):
+        """
+            Returns True if a call to T3Production may be made
+        """
+        with self.lock:
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_s:
+                self.state = self.HALF_OPEN
+                self.trial_running = False
+
+            if self.state == self.CLOSED:
+                return True
+            elif self.state == self.HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            self.trial_running = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.error("CircuitBreaker: opening after %s failures", self.consecutive_failures)
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+
+class DbAccess(object):
+    """
+        Runs calls to T3Production through the circuit breaker, retrying
+        transient ODBC errors with jittered exponential backoff. Counters are
+        kept for the diagnostics dialog.
+    """
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(db_breaker_failure_threshold, db_breaker_reset_s)
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "fast_fails": 0, "stale_served": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self.stats_lock:
+            self.stats[name] += amount
+
+    def call(self, func, retry_attempts=None):
+        """
+            Calls func, which should connect to or query T3Production
+        :param func: Function to call with no arguments
+        :param retry_attempts: Number of retries for transient errors, defaults to db_retry_attempts
+        :return: The return value of func
+        """
+        if retry_attempts is None:
+            retry_attempts = db_retry_attempts
+
+        if not self.breaker.allow():
+            self.count("fast_fails")
+            raise DbUnavailableError("HYT00", "T3Production unavailable, retrying in {0} s".format(
+                db_breaker_reset_s))
+
+        self.count("calls")
+        attempt = 0
+        while 1:
+            try:
+                result = func()
+            except pyodbc.Error as err:
+                if isinstance(err, DbUnavailableError) or not is_transient_db_error(err) or \
+                        attempt >= retry_attempts:
+                    self.count("failures")
+                    self.breaker.record_failure()
+                    raise
+
+                # Full jitter backoff
+                delay = random.uniform(0, min(db_retry_max_delay_s, db_retry_base_delay_s * 2 ** attempt))
+                logger.info("DbAccess:call: transient error %s, retry %s in %.2f s", err, attempt + 1, delay)
+                self.count("retries")
+                attempt += 1
+                time.sleep(delay)
+            except Exception:
+                # Any other error still has to end a half-open trial call
+                self.count("failures")
+                self.breaker.record_failure()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+
+class ResultCache(object):
+    """
+        Least recently used cache of the TableResults retrieved from
+        T3Production for each serial number
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, serial_number, table_results):
+        with self.lock:
+            self.entries.pop(serial_number, None)
+            self.entries[serial_number] = list(table_results)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get(self, serial_number):
+        """
+            Returns the cached TableResults for the serial number, or None
+        """
+        with self.lock:
+            table_results = self.entries.pop(serial_number, None)
+            if table_results is not None:
+                self.entries[serial_number] = table_results
+            return table_results
+
+
+class SerialArray(object):
+    """
+        Immutable sorted sequence of serial numbers stored as one string with
+        an array of offsets, which takes a fraction of the memory of a list of
+        strings. Supports len() and indexing so it can be searched with bisect.
+        The serial numbers are read from an iterable in a single pass, so no
+        list of them is needed to build the array.
+    """
+
+    def __init__(self, serial_numbers=()):
+        blob = cStringIO.StringIO()
+        self.offsets = array.array("I", [0])
+
+        position = 0
+        for serial_number in serial_numbers:
+            blob.write(serial_number)
+            position += len(serial_number)
+            self.offsets.append(position)
+
+        self.blob = blob.getvalue()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.blob[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        for index in xrange(len(self)):
+            yield self[index]
+
+    def size_bytes(self):
+        return sys.getsizeof(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+
+class SerialNumberIndex(object):
+    """
+        In-memory index of the top-level serial numbers in
+        assemblyKittingTable, used for completion and existence checks in the
+        SerialNumberDialog. The index is loaded in the background and then
+        refreshed with only the rows past the (transactionTime, transactionID)
+        watermark of the previous load.
+
+        The distinct serial numbers are streamed from T3Production
+        serial_index_fetch_size rows at a time into small sorted SerialArrays,
+        which are merged into the index without building a list of all of the
+        serial numbers.
+    """
+
+    def __init__(self):
+        self.serials = SerialArray()
+        self.last_time = None
+        self.last_id = None
+        self.refreshed_at = None
+        self.refresh_lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def __len__(self):
+        return len(self.serials)
+
+    def __contains__(self, serial_number):
+        serials = self.serials
+        index = bisect.bisect_left(serials, serial_number)
+        return index < len(serials) and serials[index] == serial_number
+
+    def is_loaded(self):
+        return self.refreshed_at is not None
+
+    def prefix_matches(self, prefix, limit=10):
+        """
+            Returns up to limit serial numbers starting with prefix
+        """
+        serials = self.serials
+        matches = []
+        index = bisect.bisect_left(serials, prefix)
+        while index < len(serials) and len(matches) < limit:
+            serial_number = serials[index]
+            if not serial_number.startswith(prefix):
+                break
+            matches.append(serial_number)
+            index += 1
+
+        return matches
+
+    def merge(self, sorted_arrays):
+        """
+            Merges sorted SerialArrays into the index, skipping duplicates
+        """
+        sorted_arrays = [serials for serials in sorted_arrays if len(serials) is not 0]
+        if len(sorted_arrays) is 0:
+            return
+
+        def unique(serial_numbers):
+            last = None
+            for serial_number in serial_numbers:
+                if serial_number != last:
+                    yield serial_number
+                    last = serial_number
+
+        # Swap in the merged array in one assignment so lookups never see a partial update
+        self.serials = SerialArray(unique(heapq.merge(self.serials, *sorted_arrays)))
+
+    def refresh(self):
+        """
+            Loads the serial numbers added to assemblyKittingTable since the
+            last refresh
+        :return: Number of serial numbers read
+        """
+        with self.refresh_lock:
+            def query():
+                cnxn = connect_db()
+                try:
+                    db_cursor = cnxn.cursor()
+                    watermark = get_table_watermark("assemblyKittingTable", db_cursor)
+                    if watermark is None or watermark == (self.last_time, self.last_id):
+                        return watermark, []
+
+                    # Only read up to the watermark, rows added meanwhile are read by the next refresh
+                    sql_query = "SELECT DISTINCT serialNumberUnit FROM assemblyKittingTable WHERE " \
+                                "(transactionTime < ? OR (transactionTime = ? AND transactionID <= ?))"
+                    params = [watermark[0], watermark[0], watermark[1]]
+                    if self.last_time is not None:
+                        sql_query += " AND (transactionTime > ? OR (transactionTime = ? AND transactionID > ?))"
+                        params.extend([self.last_time, self.last_time, self.last_id])
+                    db_cursor.execute(sql_query, *params)
+
+                    sorted_arrays = []
+                    while 1:
+                        rows = db_cursor.fetchmany(serial_index_fetch_size)
+                        if len(rows) is 0:
+                            break
+                        sorted_arrays.append(SerialArray(sorted(set(str(row[0]).strip().upper() for row in rows
+                                                                    if row[0] is not None))))
+
+                    return watermark, sorted_arrays
+                finally:
+                    close_db(cnxn)
+
+            watermark, sorted_arrays = db_access.call(query)
+
+            self.merge(sorted_arrays)
+            if watermark is not None:
+                self.last_time, self.last_id = watermark
+            self.refreshed_at = datetime.datetime.now()
+
+            read_count = sum(len(serials) for serials in sorted_arrays)
+            logger.info("SerialNumberIndex:refresh: %s serial numbers read, %s in index", read_count, len(self))
+            return read_count
+
+    def start_refresh(self, interval_s):
+        """
+            Starts a background thread which refreshes the index every
+            interval_s seconds
+        """
+        def worker():
+            while not self.stop_event.is_set():
+                try:
+                    self.refresh()
+                except pyodbc.Error as err:
+                    logger.error("SerialNumberIndex:refresh: refresh failed: %s", err)
+                self.stop_event.wait(interval_s)
+
+        thread = threading.Thread(target=worker, name="serial-index")
+        thread.daemon = True
+        thread.start()
+
+    def stop_refresh(self):
+        self.stop_event.set()
+
+
+class ProductionMonitor(object):
+    """
+        Polls every table in db_table_list for transactions past the last
+        (transactionTime, transactionID) seen and keeps the transactions from
+        the last window_hours in a bounded rolling window. Station counts,
+        fallouts and failure codes are updated incrementally as transactions
+        enter and leave the window, so history is never fetched twice.
+
+        The poll interval halves while new transactions are arriving and backs
+        off when the line is quiet, a poll is slow or T3Production is
+        unavailable.
+    """
+
+    def __init__(self, window_hours, max_events):
+        self.window = datetime.timedelta(hours=window_hours)
+        self.window_hours = window_hours
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+        # Each event is (transactionTime, db_table, serial number, failure code)
+        self.events = deque()
+        self.station_counts = Counter()
+        self.station_failures = Counter()
+        self.failure_counts = Counter()
+        self.watermarks = {}
+
+        self.server_offset = datetime.timedelta(0)
+        self.poll_interval_s = monitor_min_poll_s
+        self.last_poll_time = None
+        self.last_poll_s = 0.0
+        self.poll_error = None
+
+    def poll_table(self, db_table, db_cursor, server_now):
+        """
+            Returns the (transactionTime, transactionID, serial number, failure
+            code) rows of db_table past its watermark
+        """
+        if db_table not in db_record_classes:
+            db_cursor.execute("SELECT * FROM {0} WHERE 1=0".format(db_table))
+        record_class = get_record_class(db_table, db_cursor)
+        failure_code_text = "failureCode" if "failureCode" in record_class.field_set else "NULL"
+
+        sql_query = "SELECT transactionTime, transactionID, {0}, {1} FROM {2} WHERE ".format(
+            get_serial_number_column(db_table), failure_code_text, db_table)
+        if db_table in self.watermarks:
+            last_time, last_id = self.watermarks[db_table]
+            db_cursor.execute(sql_query + "transactionTime > ? OR (transactionTime = ? AND transactionID > ?) "
+                                          "ORDER BY transactionTime, transactionID", last_time, last_time, last_id)
+        else:
+            db_cursor.execute(sql_query + "transactionTime > ? ORDER BY transactionTime, transactionID",
+                              server_now - self.window)
+
+        return db_cursor.fetchall()
+
+    def poll(self):
+        """
+            Fetches the new transactions for all of the stations and adds them
+            to the window
+        :return: Number of new transactions
+        """
+        def query():
+            cnxn = connect_db()
+            try:
+                db_cursor = cnxn.cursor()
+                # transactionTime is compared against the server clock rather than this PC's
+                db_cursor.execute("SELECT GETDATE()")
+                server_now = db_cursor.fetchone()[0]
+                return server_now, [(table, self.poll_table(table, db_cursor, server_now))
+                                    for table in db_table_list]
+            finally:
+                close_db(cnxn)
+
+        start_time = time.time()
+        server_now, table_rows = db_access.call(query)
+        self.server_offset = server_now - datetime.datetime.now()
+
+        events = []
+        for table, rows in table_rows:
+            for transaction_time, transaction_id, serial_number, failure_code in rows:
+                if failure_code:
+                    # Resolve new failure codes here rather than on the UI thread
+                    get_failure_description(failure_code)
+                events.append((transaction_time, table, serial_number, failure_code or None))
+
+            if len(rows) is not 0:
+                self.watermarks[table] = (rows[-1][0], rows[-1][1])
+            elif table not in self.watermarks:
+                self.watermarks[table] = (server_now - self.window, 0)
+
+        events.sort(key=itemgetter(0))
+        with self.lock:
+            for event in events:
+                self.add_event(event)
+            self.expire_events()
+
+        self.last_poll_s = time.time() - start_time
+        self.last_poll_time = datetime.datetime.now()
+
+        return len(events)
+
+    def add_event(self, event):
+        self.events.append(event)
+        self.station_counts[event[1]] += 1
+        if event[3] is not None:
+            self.station_failures[event[1]] += 1
+            self.failure_counts[event[3]] += 1
+
+    def remove_event(self):
+        event = self.events.popleft()
+        self.station_counts[event[1]] -= 1
+        if event[3] is not None:
+            self.station_failures[event[1]] -= 1
+            self.failure_counts[event[3]] -= 1
+            if self.failure_counts[event[3]] <= 0:
+                del self.failure_counts[event[3]]
+
+    def expire_events(self):
+        oldest_time = datetime.datetime.now() + self.server_offset - self.window
+        while len(self.events) > 0 and (len(self.events) > self.max_events or self.events[0][0] < oldest_time):
+            self.remove_event()
+
+    def next_interval(self, new_count):
+        """
+            Returns the time to wait before the next poll
+        """
+        if new_count > 0:
+            interval = self.poll_interval_s / 2.0
+        else:
+            interval = self.poll_interval_s * 1.5
+
+        # Keep the polling load bounded when queries are slow
+        interval = max(interval, self.last_poll_s * 4)
+
+        return min(monitor_max_poll_s, max(monitor_min_poll_s, interval))
+
+    def start(self):
+        def worker():
+            while not self.stop_event.is_set():
+                try:
+                    new_count = self.poll()
+                    self.poll_error = None
+                    self.poll_interval_s = self.next_interval(new_count)
+                except pyodbc.Error as err:
+                    logger.error("ProductionMonitor:poll: poll failed: %s", err)
+                    self.poll_error = str(err)
+                    self.poll_interval_s = monitor_max_poll_s
+                except Exception as err:
+                    # Keep polling after an unexpected error rather than silently ending the thread
+                    logger.exception("ProductionMonitor:poll: poll failed")
+                    self.poll_error = str(err) or err.__class__.__name__
+                    self.poll_interval_s = monitor_max_poll_s
+                self.stop_event.wait(self.poll_interval_s)
+
+        thread = threading.Thread(target=worker, name="production-monitor")
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def snapshot(self, recent_count=50):
+        """
+            Returns a consistent copy of the window for display
+        :return: dict of the totals, counters and the most recent events
+        """
+        with self.lock:
+            self.expire_events()
+            return {"total": len(self.events),
+                    "fallouts": self.station_counts["falloutTable"],
+                    "station_counts": dict(self.station_counts),
+                    "station_failures": dict(self.station_failures),
+                    "failure_counts": self.failure_counts.most_common(),
+                    "recent": list(islice(reversed(self.events), recent_count))}
+
+
+class Prefetcher(object):
+    """
+        Opt-in background prefetch of the serial numbers likely to be scanned
+        next. After each lookup the next prefetch_depth serial numbers are
+        predicted with predict_serial_numbers() and fetched one at a time into
+        the result cache, pausing while a lookup for the user is running.
+        Prefetched results are served by query_beacon_tables() for up to
+        prefetch_max_age_s. Predictions that are no longer part of the current
+        plan, because the scans have diverged, are cancelled before they are
+        fetched.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.last_serial = None
+        self.planned = []
+        self.queue = deque()
+        self.prefetched = {}
+        self.in_flight = None
+        self.foreground = 0
+        self.fetch_times = deque()
+
+        self.stats = {"lookups": 0, "hits": 0, "fetched": 0, "wasted": 0, "cancelled": 0}
+
+    def set_enabled(self, enabled):
+        with self.lock:
+            self.enabled = enabled
+            if not enabled:
+                self.cancel_plan()
+            self.lock.notify()
+
+        if enabled and self.thread is None:
+            self.thread = threading.Thread(target=self.worker, name="prefetch")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        with self.lock:
+            self.lock.notify()
+
+    def cancel_plan(self):
+        # Called with the lock held
+        self.stats["cancelled"] += len(self.queue)
+        self.queue.clear()
+        self.planned = []
+
+    def drop_prefetched(self, keep):
+        # Called with the lock held, counts unused prefetches which are dropped as wasted
+        oldest_time = time.time() - prefetch_max_age_s
+        for serial_number, fetched_at in self.prefetched.items():
+            if serial_number not in keep or fetched_at < oldest_time:
+                del self.prefetched[serial_number]
+                self.stats["wasted"] += 1
+
+    def on_lookup(self, serial_number):
+        """
+            Called when the user looks up a serial number, plans the next
+            prefetches from it
+        """
+        with self.lock:
+            if not self.enabled:
+                return
+
+            self.stats["lookups"] += 1
+            if len(self.planned) is not 0 and serial_number not in self.planned:
+                logger.info("Prefetcher:on_lookup: %s diverged from the predicted serial numbers", serial_number)
+                self.cancel_plan()
+
+            self.planned = predict_serial_numbers(serial_number, self.last_serial, prefetch_depth)
+            self.last_serial = serial_number
+            self.drop_prefetched(set(self.planned) | {serial_number})
+
+            # Keep the queued predictions which are still planned and add the new ones
+            queued = set(self.queue)
+            self.queue = deque(planned_sn for planned_sn in self.planned
+                               if planned_sn not in self.prefetched and planned_sn != self.in_flight)
+            self.stats["cancelled"] += len(queued - set(self.queue))
+            self.lock.notify()
+
+    def take(self, serial_number):
+        """
+            Returns the prefetched TableResults for the serial number, or None
+            if it has not been prefetched
+        """
+        with self.lock:
+            fetched_at = self.prefetched.pop(serial_number, None)
+            if fetched_at is None:
+                return None
+
+            table_results = result_cache.get(serial_number)
+            if table_results is None or fetched_at < time.time() - prefetch_max_age_s:
+                self.stats["wasted"] += 1
+                return None
+
+            self.stats["hits"] += 1
+
+        logger.info("Prefetcher:take: serving prefetched %s", serial_number)
+        return table_results
+
+    def begin_foreground(self):
+        with self.lock:
+            self.foreground += 1
+
+    def end_foreground(self):
+        with self.lock:
+            self.foreground -= 1
+            self.lock.notify()
+
+    def within_budget(self):
+        # Called with the lock held
+        while len(self.fetch_times) is not 0 and self.fetch_times[0] < time.time() - 60:
+            self.fetch_times.popleft()
+        return len(self.fetch_times) < prefetch_max_queries_per_min
+
+    def next_serial(self):
+        """
+            Waits for the next serial number to prefetch. Returns None when
+            stopped.
+        """
+        with self.lock:
+            while not self.stop_event.is_set():
+                if self.enabled and self.foreground is 0 and len(self.queue) is not 0 and self.within_budget():
+                    self.fetch_times.append(time.time())
+                    self.in_flight = self.queue.popleft()
+                    return self.in_flight
+                self.lock.wait(1.0)
+
+        return None
+
+    def worker(self):
+        while 1:
+            serial_number = self.next_serial()
+            if serial_number is None:
+                return
+
+            # Don't add load while T3Production is failing, or query serial numbers which don't exist
+            mirror = local_mirror
+            if db_access.breaker.state != CircuitBreaker.CLOSED or \
+                    (serial_index.is_loaded() and serial_number not in serial_index) or \
+                    (mirror is not None and mirror.is_ready()):
+                with self.lock:
+                    self.in_flight = None
+                continue
+
+            logger.debug("Prefetcher:worker: prefetching %s", serial_number)
+            try:
+                table_results = list(query_beacon_tables(serial_number))
+            except (pyodbc.Error, sqlite3.Error) as err:
+                logger.info("Prefetcher:worker: unable to prefetch %s: %s", serial_number, err)
+                with self.lock:
+                    self.in_flight = None
+                continue
+
+            with self.lock:
+                self.in_flight = None
+                self.stats["fetched"] += 1
+                if serial_number not in self.planned:
+                    self.stats["wasted"] += 1
+                elif all(table_result.source == "T3Production" for table_result in table_results):
+                    self.prefetched[serial_number] = time.time()
+
+            self.stop_event.wait(prefetch_delay_s)
+
+
+db_access = DbAccess()
+result_cache = ResultCache(result_cache_size)
+serial_index = SerialNumberIndex()
+prefetcher = Prefetcher()
+
+
+# -----------------------------------------------------------------------------
+# LOCAL MIRROR
+# -----------------------------------------------------------------------------
+
+sqlite3.register_adapter(decimal.Decimal, str)
+sqlite3.register_converter("decimal", lambda value: decimal.Decimal(value))
+
+
+class LocalMirror(object):
+    """
+        Local SQLite copy of the manufacturing tables which allows beacon
+        lookups to be answered without a round trip to T3Production.
+
+        The tables in db_table_list are kept current with a delta sync that
+        only pulls rows past the (transactionTime, transactionID) high-water
+        mark stored for each table. The lookup tables in mirror_lookup_tables
+        are small and are copied in full on each sync.
+
+        Serial numbers are stored without trailing spaces in COLLATE NOCASE
+        columns, so lookups match the way T3Production's collation does.
+    """
+    serial_columns = ("serialNumber", "serialNumberUnit", "serialNumberDigital", "serialNumberAnalog")
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.sync_thread = None
+        self.sync_error = None
+
+        self.cnxn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+
+        with self.lock:
+            self.cnxn.execute("CREATE TABLE IF NOT EXISTS mirror_sync_state (db_table TEXT PRIMARY KEY, "
+                              "last_time timestamp, last_id INTEGER, synced_at timestamp)")
+
+            # Tables from older mirrors compare serial numbers exactly, so they are copied again
+            for db_table, table_sql in self.cnxn.execute("SELECT name, sql FROM sqlite_master WHERE "
+                                                         "type='table'").fetchall():
+                if any(col in table_sql for col in self.serial_columns) and "COLLATE NOCASE" not in table_sql:
+                    logger.info("LocalMirror: rebuilding %s with case insensitive serial numbers", db_table)
+                    self.cnxn.execute("DROP TABLE {0}".format(db_table))
+                    self.cnxn.execute("DELETE FROM mirror_sync_state WHERE db_table=?", (db_table,))
+            self.cnxn.commit()
+
+    def close(self):
+        """
+            Stops the sync thread, waiting for it to finish, and closes the
+            mirror database
+        """
+        self.stop_sync()
+        if self.sync_thread is not None:
+            self.sync_thread.join()
+            self.sync_thread = None
+        with self.lock:
+            self.cnxn.close()
+
+    def get_sync_state(self, db_table):
+        with self.lock:
+            return self.cnxn.execute("SELECT last_time, last_id, synced_at FROM mirror_sync_state WHERE db_table=?",
+                                     (db_table,)).fetchone()
+
+    def is_ready(self):
+        """
+            Returns True once every table in db_table_list has been synced at
+            least once
+        """
+        return self.last_sync_time() is not None
+
+    def last_sync_time(self):
+        """
+            Returns the time of the oldest table sync, or None if any of the
+            tables has not been synced yet
+        """
+        with self.lock:
+            rows = self.cnxn.execute("SELECT db_table, synced_at FROM mirror_sync_state").fetchall()
+
+        synced = dict(rows)
+        if any(synced.get(table) is None for table in db_table_list):
+            return None
+
+        return min(synced[table] for table in db_table_list)
+
+    def create_table(self, db_table, description):
+        """
+            Creates the mirror table and its indexes from the description of a
+            T3Production query on the table
+        """
+        type_names = {datetime.datetime: "timestamp", datetime.date: "date", decimal.Decimal: "decimal",
+                      int: "INTEGER", long: "INTEGER", bool: "INTEGER", float: "REAL", bytearray: "BLOB"}
+
+        col_defs = ", ".join("{0} {1}".format(column[0], "TEXT COLLATE NOCASE" if column[0] in self.serial_columns
+                                              else type_names.get(column[1], "TEXT"))
+                             for column in description)
+        col_names = [column[0] for column in description]
+
+        with self.lock:
+            self.cnxn.execute("CREATE TABLE IF NOT EXISTS {0} ({1})".format(db_table, col_defs))
+
+            index_cols = [col for col in self.serial_columns + ("transactionTime",) if col in col_names]
+            for col in index_cols:
+                self.cnxn.execute("CREATE INDEX IF NOT EXISTS ix_{0}_{1} ON {0} ({1})".format(db_table, col))
+
+            if "transactionID" in col_names:
+                self.cnxn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_{0}_transactionID ON {0} "
+                                  "(transactionID)".format(db_table))
+            self.cnxn.commit()
+
+    def sync_table(self, db_table, db_cursor):
+        """
+            Pulls the rows of a manufacturing table which are newer than the
+            table's high-water mark. Rows are committed in chunks so an
+            interrupted sync keeps the rows it has already copied.
+        :return: Number of rows copied
+        """
+        state = self.get_sync_state(db_table)
+
+        if state is None or state[0] is None:
+            db_cursor.execute("SELECT * FROM {0} ORDER BY transactionTime, transactionID".format(db_table))
+        else:
+            db_cursor.execute("SELECT * FROM {0} WHERE transactionTime > ? OR (transactionTime = ? AND "
+                              "transactionID > ?) ORDER BY transactionTime, transactionID".format(db_table),
+                              state[0], state[0], state[1])
+
+        self.create_table(db_table, db_cursor.description)
+        col_names = [column[0] for column in db_cursor.description]
+        insert_sql = "INSERT OR REPLACE INTO {0} ({1}) VALUES ({2})".format(db_table, ", ".join(col_names),
+                                                                            ",".join("?" * len(col_names)))
+        time_index = col_names.index("transactionTime")
+        id_index = col_names.index("transactionID")
+
+        last_time, last_id = (None, None) if state is None else state[:2]
+        row_count = 0
+        while 1:
+            rows = db_cursor.fetchmany(mirror_sync_chunk_size)
+            if not rows:
+                break
+
+            last_time, last_id = rows[-1][time_index], rows[-1][id_index]
+            row_count += len(rows)
+
+            with self.lock:
+                self.cnxn.executemany(insert_sql, self.normalize_rows(col_names, rows))
+                self.set_sync_state(db_table, last_time, last_id, None)
+                self.cnxn.commit()
+
+            # The rows copied so far are kept, the rest are copied by the next sync
+            if self.stop_event.is_set():
+                return row_count
+
+        with self.lock:
+            self.set_sync_state(db_table, last_time, last_id, datetime.datetime.now())
+            self.cnxn.commit()
+
+        return row_count
+
+    def copy_table(self, db_table, db_cursor):
+        """
+            Replaces the mirror copy of a lookup table with the current contents
+            of the T3Production table
+        :return: Number of rows copied
+        """
+        db_cursor.execute("SELECT * FROM {0}".format(db_table))
+        rows = db_cursor.fetchall()
+
+        self.create_table(db_table, db_cursor.description)
+        col_names = [column[0] for column in db_cursor.description]
+        insert_sql = "INSERT INTO {0} ({1}) VALUES ({2})".format(db_table, ", ".join(col_names),
+                                                                 ",".join("?" * len(col_names)))
+
+        with self.lock:
+            self.cnxn.execute("DELETE FROM {0}".format(db_table))
+            self.cnxn.executemany(insert_sql, self.normalize_rows(col_names, rows))
+            self.set_sync_state(db_table, None, None, datetime.datetime.now())
+            self.cnxn.commit()
+
+        return len(rows)
+
+    def normalize_rows(self, col_names, rows):
+        """
+            Returns the rows as tuples with the trailing spaces removed from
+            the serial numbers
+        """
+        serial_indexes = [index for index, col in enumerate(col_names) if col in self.serial_columns]
+        if len(serial_indexes) is 0:
+            return [tuple(row) for row in rows]
+
+        normalized = []
+        for row in rows:
+            row = list(row)
+            for index in serial_indexes:
+                if isinstance(row[index], basestring):
+                    row[index] = row[index].rstrip()
+            normalized.append(tuple(row))
+
+        return normalized
+
+    def set_sync_state(self, db_table, last_time, last_id, synced_at):
+        with self.lock:
+            if synced_at is None:
+                # Keep the previous sync time while a table sync is in progress
+                previous = self.cnxn.execute("SELECT synced_at FROM mirror_sync_state WHERE db_table=?",
+                                             (db_table,)).fetchone()
+                synced_at = previous[0] if previous is not None else None
+
+            self.cnxn.execute("INSERT OR REPLACE INTO mirror_sync_state (db_table, last_time, last_id, synced_at) "
+                              "VALUES (?, ?, ?, ?)", (db_table, last_time, last_id, synced_at))
+
+    def sync(self):
+        """
+            Runs a delta sync of all of the mirrored tables
+        """
+        logger.info("LocalMirror:sync: Connecting to T3Production database")
+        cnxn = db_access.call(connect_db)
+        try:
+            db_cursor = cnxn.cursor()
+            for table in db_table_list:
+                row_count = self.sync_table(table, db_cursor)
+                logger.info("LocalMirror:sync: %s -> %s new rows", table, row_count)
+                if self.stop_event.is_set():
+                    return
+
+            for table in mirror_lookup_tables:
+                if self.stop_event.is_set():
+                    return
+                row_count = self.copy_table(table, db_cursor)
+                logger.info("LocalMirror:sync: %s -> %s rows", table, row_count)
+        finally:
+            close_db(cnxn)
+
+    def start_sync(self, interval_s):
+        """
+            Starts a background thread which syncs the mirror every interval_s
+            seconds
+        """
+        if self.sync_thread is not None and self.sync_thread.is_alive():
+            return
+
+        def worker():
+            while not self.stop_event.is_set():
+                try:
+                    self.sync()
+                    self.sync_error = None
+                except (pyodbc.Error, sqlite3.Error) as err:
+                    logger.error("LocalMirror:sync: sync failed: %s", err)
+                    self.sync_error = str(err)
+                self.stop_event.wait(interval_s)
+
+        self.stop_event.clear()
+        self.sync_thread = threading.Thread(target=worker, name="mirror-sync")
+        self.sync_thread.daemon = True
+        self.sync_thread.start()
+
+    def stop_sync(self):
+        self.stop_event.set()
+
+    def get_table_result(self, db_table, serial_number):
+        """
+            Returns the mirrored rows of a manufacturing table for the
+            specified serial number
+        :return: TableResult with the rows ordered by transactionTime
+        """
+        sql_query = "SELECT * FROM {0} WHERE {1}=? COLLATE NOCASE ORDER BY transactionTime".format(
+            db_table, get_serial_number_column(db_table))
+
+        with self.lock:
+            synced_at = self.get_sync_state(db_table)[2]
+            db_cursor = self.cnxn.execute(sql_query, (serial_number.rstrip(),))
+            rows = db_cursor.fetchall()
+            record_class = get_record_class(db_table, db_cursor)
+
+        return TableResult(db_table, [record_class(row) for row in rows], "local mirror", synced_at)
+
+    def lookup_value(self, db_table, key_col, key, value_col):
+        """
+            Returns a single value from a mirrored table, or None if the table
+            has not been synced or the key is not found
+        """
+        with self.lock:
+            if self.get_sync_state(db_table) is None:
+                return None
+            row = self.cnxn.execute("SELECT {0} FROM {1} WHERE {2}=?".format(value_col, db_table, key_col),
+                                    (key,)).fetchone()
+
+        return None if row is None else row[0]
+
+
+# -----------------------------------------------------------------------------
+# COLUMNAR EXPORT FILES
 # -----------------------------------------------------------------------------
 
-class CustomTaskBarIcon(wx.TaskBarIcon):
+# Columnar export (.bcol) file layout:
+#   BCOL_MAGIC
+#   Row groups, each holding up to export_row_group_size rows of one DB table
+#   as one zlib compressed chunk per column
+#   Footer, zlib compressed JSON listing the row groups, their column chunks
+#   and the row ranges of each serial number
+#   Footer offset and length (two little-endian uint64) and BCOL_MAGIC
+#
+# Column chunk types: "t" timestamp (int64 microseconds since BCOL_EPOCH),
+# "i" integer (int64), "b" bit (int64), "f" number (float64), "s" unicode text
+# and "r" byte string. Chunks of columns containing NULLs start with one byte
+# per row, 1 for NULL.
+BCOL_MAGIC = "BCOL0001"
+BCOL_EPOCH = datetime.datetime(1970, 1, 1)
+BCOL_TRAILER = struct.Struct("<QQ8s")
+
+
+class ColumnarFileWriter(object):
+    """
+        Streams DB table rows to a columnar export file. Rows are buffered per
+        table and written as row groups sorted by serial number and
+        transactionTime, so each beacon's rows are contiguous and the reader
+        only has to decompress the row groups holding the beacon it opens.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.f = open(file_path, "wb")
+        self.f.write(BCOL_MAGIC)
+
+        self.pending = {}
+        self.row_groups = []
+        self.serials = {}
+        self.row_count = 0
+
+    def write_table(self, table):
+        """
+            Adds the rows of a ColumnarTable to the file, writing row groups
+            once enough rows have been buffered for the table
+        """
+        if len(table) is 0:
+            return
+
+        if table.db_table not in self.pending:
+            self.pending[table.db_table] = ColumnarTable(table.record_class)
+        pending = self.pending[table.db_table]
+        for name in table.fields:
+            pending.column(name).extend(table.column(name))
+
+        if len(pending) >= export_row_group_size:
+            self.flush_table(table.db_table)
+
+    def flush_table(self, db_table):
+        pending = self.pending.pop(db_table, None)
+        if pending is None:
+            return
+
+        serial_column = pending.column(get_serial_number_column(db_table))
+        time_column = pending.column("transactionTime")
+        order = sorted(xrange(len(pending)), key=lambda i: (serial_column[i], time_column[i]))
+
+        for start in xrange(0, len(order), export_row_group_size):
+            self.write_row_group(pending, order[start:start + export_row_group_size])
+
+    def write_row_group(self, table, row_order):
+        group_index = len(self.row_groups)
+        columns = []
+        for name in table.fields:
+            values = table.column(name)
+            col_type, has_nulls, payload = encode_column([values[i] for i in row_order])
+            offset = self.f.tell()
+            chunk = zlib.compress(payload, export_compression_level)
+            self.f.write(chunk)
+            columns.append([name, col_type, has_nulls, offset, len(chunk)])
+
+        self.row_groups.append({"db_table": table.db_table, "rows": len(row_order), "columns": columns})
+        self.row_count += len(row_order)
+
+        # Record the contiguous row range of each serial number in the group
+        serial_column = table.column(get_serial_number_column(table.db_table))
+        start = 0
+        for row in xrange(1, len(row_order) + 1):
+            if row == len(row_order) or serial_column[row_order[row]] != serial_column[row_order[start]]:
+                self.serials.setdefault(serial_column[row_order[start]], []).append([group_index, start,
+                                                                                     row - start])
+                start = row
+
+    def close(self):
+        """
+            Writes the remaining rows and the footer and closes the file
+        """
+        for db_table in list(self.pending):
+            self.flush_table(db_table)
+
+        footer = zlib.compress(json.dumps({"version": 1,
+                                           "created": str(datetime.datetime.now()),
+                                           "row_groups": self.row_groups,
+                                           "serials": self.serials}), export_compression_level)
+        offset = self.f.tell()
+        self.f.write(footer)
+        self.f.write(BCOL_TRAILER.pack(offset, len(footer), BCOL_MAGIC))
+        self.f.close()
+
+    def abort(self):
+        """
+            Closes and removes a partially written file
+        """
+        self.f.close()
+        os.remove(self.file_path)
+
+
+class ColumnarFileReader(object):
+    """
+        Reads a columnar export file. Only the footer is read when the file is
+        opened, the row groups are read as beacons or tables are requested.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+        with open(file_path, "rb") as f:
+            if f.read(len(BCOL_MAGIC)) != BCOL_MAGIC:
+                raise ValueError("{0} is not a columnar export file".format(file_path))
+            f.seek(-BCOL_TRAILER.size, os.SEEK_END)
+            offset, length, magic = BCOL_TRAILER.unpack(f.read(BCOL_TRAILER.size))
+            if magic != BCOL_MAGIC:
+                raise ValueError("{0} is incomplete".format(file_path))
+            f.seek(offset)
+            footer = json.loads(zlib.decompress(f.read(length)))
+
+        self.row_groups = footer["row_groups"]
+        self.serials = footer["serials"]
+
+    def serial_numbers(self):
+        return sorted(self.serials)
+
+    def read_row_group(self, f, group_index):
+        """
+            Returns the db_table and the column name, values pairs of a row group
+        """
+        row_group = self.row_groups[group_index]
+        columns = []
+        for name, col_type, has_nulls, offset, length in row_group["columns"]:
+            f.seek(offset)
+            columns.append((name, decode_column(col_type, has_nulls, row_group["rows"],
+                                                zlib.decompress(f.read(length)))))
+
+        return row_group["db_table"], columns
+
+    def read_beacon(self, serial_number):
+        """
+            Returns the records of a beacon ordered by transactionTime, in the
+            same form as the records loaded from a JSON report file
+        """
+        records = []
+        with open(self.file_path, "rb") as f:
+            for group_index, start, count in self.serials.get(serial_number, []):
+                db_table, columns = self.read_row_group(f, group_index)
+                for row in xrange(start, start + count):
+                    record = dict((name, values[row]) for name, values in columns)
+                    record["db_table"] = db_table
+                    records.append(record)
+
+        records.sort(key=itemgetter("transactionTime"))
+
+        return records
+
+    def read_columns(self, db_table):
+        """
+            Returns all of the rows of a DB table as an OrderedDict of column
+            name to list of values, for lot analysis
+        """
+        table_columns = OrderedDict()
+        with open(self.file_path, "rb") as f:
+            for group_index, row_group in enumerate(self.row_groups):
+                if row_group["db_table"] != db_table:
+                    continue
+                for name, values in self.read_row_group(f, group_index)[1]:
+                    table_columns.setdefault(name, []).extend(values)
+
+        return table_columns
+
+
+# -----------------------------------------------------------------------------
+# SEARCH INDEX
+# -----------------------------------------------------------------------------
+
+class SearchIndex(object):
+    """
+        Inverted index over the records of the loaded results pages. Each
+        record is indexed under the tokens of its failure code, failure
+        description, employee, workstation, table and serial number, so
+        queries are answered from the postings without scanning the pages.
+
+        Queries are whitespace separated terms which must all match. A term
+        can be limited to a field with "field:value", e.g. "code:42 antenna".
+    """
+    FIELDS = ("code", "desc", "employee", "workstation", "table", "sn")
+
+    def __init__(self):
+        self.records = {}
+        self.record_terms = {}
+        self.entry_ids = {}
+        self.postings = {}
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_terms(self, render_entry):
+        """
+            Returns the set of (field, token) terms for a RenderEntry
+        """
+        entry = render_entry.entry
+        db_table = entry["db_table"]
+        terms = set()
+
+        def add_terms(field, value):
+            if value is not None:
+                terms.update((field, token) for token in tokenize_search_text(unicode(value)))
+
+        failure_code = entry.get("failureCode")
+        if failure_code:
+            add_terms("code", failure_code)
+            add_terms("desc", failure_description_cache.get(failure_code))
+        if entry.get("failureDescription") != "Pass":
+            add_terms("desc", entry.get("failureDescription"))
+
+        employee_id = entry.get("employeeID")
+        add_terms("employee", employee_id)
+        add_terms("employee", employee_name_cache.get(employee_id))
+        add_terms("workstation", entry.get("workstationID"))
+
+        add_terms("table", db_table)
+        add_terms("table", format_db_table_str(db_table))
+        add_terms("sn", entry.get(get_serial_number_column(db_table)))
+
+        return terms
+
+    def add_entries(self, render_entries):
+        """
+            Adds the records of a results page to the index. Records which are
+            already indexed are skipped.
+        :param render_entries: RenderEntry list of the page
+        """
+        for render_entry in render_entries:
+            if id(render_entry) in self.entry_ids:
+                continue
+
+            record_id = self.next_id
+            self.next_id += 1
+
+            terms = self.get_terms(render_entry)
+            self.records[record_id] = render_entry
+            self.record_terms[record_id] = terms
+            self.entry_ids[id(render_entry)] = record_id
+
+            for term in terms:
+                self.postings.setdefault(term, set()).add(record_id)
+                self.postings.setdefault((None, term[1]), set()).add(record_id)
+
+    def remove_entries(self, render_entries):
+        """
+            Removes the records of a closed results page from the index
+        """
+        for render_entry in render_entries:
+            record_id = self.entry_ids.pop(id(render_entry), None)
+            if record_id is None:
+                continue
+
+            del self.records[record_id]
+            for term in self.record_terms.pop(record_id):
+                for key in (term, (None, term[1])):
+                    postings = self.postings[key]
+                    postings.discard(record_id)
+                    if len(postings) is 0:
+                        del self.postings[key]
+
+    def search(self, query, limit=None):
+        """
+            Returns the RenderEntries matching all of the terms in the query,
+            most recent first
+        :param query: Query string, see SearchIndex
+        :param limit: Maximum number of results
+        :return: List of RenderEntry
+        """
+        keys = []
+        for term in query.split():
+            field, sep, value = term.rpartition(":")
+            if field.lower() not in self.FIELDS:
+                field, value = None, term
+            else:
+                field = field.lower()
+
+            # Terms such as "no-fix" produce several tokens, which must all match
+            keys.extend((field, token) for token in tokenize_search_text(value))
+
+        if len(keys) is 0:
+            return []
+
+        postings = sorted((self.postings.get(key, set()) for key in keys), key=len)
+        matches = set(postings[0])
+        for record_ids in postings[1:]:
+            matches.intersection_update(record_ids)
+            if len(matches) is 0:
+                break
+
+        results = sorted((self.records[record_id] for record_id in matches), key=itemgetter(0), reverse=True)
+
+        return results if limit is None else results[:limit]
+
+
+search_index = SearchIndex()
+
+
+# -----------------------------------------------------------------------------
+# CLASSES
+# -----------------------------------------------------------------------------
+
+class CustomTaskBarIcon(wx.TaskBarIcon):
+
+    def __init__(self, parent):
+        super(CustomTaskBarIcon, self).__init__()
+
+        self.parent = parent
+
+        # Setup
+        ico = wx.Icon(app_icon, wx.BITMAP_TYPE_PNG)
+        self.SetIcon(ico)
+        self.parent.SetIcon(ico)
+
+        # Event Handlers
+        self.Bind(wx.EVT_MENU, self.on_menu)
+
+    def create_popup_menu(self):
+        """
+            Base class virtual method for creating the popup menu for the icon
+        """
+        menu = wx.Menu()
+        menu.Append(NEW_QUERY, "New Query")
+        menu.Append(SAVE_RESULTS, "Save Results")
+        menu.AppendSeparator()
+        menu.Append(APP_EXIT, "Exit")
+
+        return menu
+
+    def on_menu(self, e):
+        evt_id = e.GetId()
+
+        if evt_id == NEW_QUERY:
+            self.parent.new_query()
+        elif evt_id == SAVE_RESULTS:
+            self.parent.save_results()
+        elif evt_id == APP_EXIT:
+            self.parent.on_quit()
+        else:
+            e.Skip()
+
+
+class FileMenu(wx.Menu):
+
+    def __init__(self, parent):
+        super(FileMenu, self).__init__()
+
+        new_query_item = wx.MenuItem(self, NEW_QUERY, "&New Query\tCtrl+N")
+        new_query_item.SetBitmap(wx.Bitmap("icons\search25.png"))
+
+        open_file_item = wx.MenuItem(self, OPEN_FILE, "&Open Report File\tCtrl+O")
+        open_file_item.SetBitmap(wx.Bitmap("icons\\add25.png"))
+
+        save_results_item = wx.MenuItem(self, SAVE_RESULTS, "&Save Results\tCtrl+S")
+        save_results_item.SetBitmap(wx.Bitmap("icons\down25.png"))
+
+        genealogy_item = wx.MenuItem(self, GENEALOGY_QUERY, "&Genealogy Query...\tCtrl+G")
+
+        df_analysis_item = wx.MenuItem(self, DF_ANALYSIS, "&DF Lot Analysis...\tCtrl+D")
+
+        export_lot_item = wx.MenuItem(self, EXPORT_LOT, "&Export Lot (Columnar)...\tCtrl+E")
+
+        search_item = wx.MenuItem(self, SEARCH_RECORDS, "Searc&h Loaded Records...\tCtrl+F")
+
+        quit_item = wx.MenuItem(self, APP_EXIT, "&Quit\tCtrl+Q")
+        quit_item.SetBitmap(wx.Bitmap("icons\close25.png"))
+
+        # Append Menu Items
+        self.AppendItem(new_query_item)
+        self.AppendItem(genealogy_item)
+        self.AppendItem(open_file_item)
+        self.AppendItem(save_results_item)
+        self.AppendItem(export_lot_item)
+        self.AppendSeparator()
+        self.AppendItem(df_analysis_item)
+        self.AppendItem(search_item)
+        self.AppendSeparator()
+        self.AppendItem(quit_item)
+
+        # Bind Menu Items
+        self.Bind(wx.EVT_MENU, parent.new_query, new_query_item)
+        self.Bind(wx.EVT_MENU, parent.save_results, save_results_item)
+        self.Bind(wx.EVT_MENU, parent.export_lot, export_lot_item)
+        self.Bind(wx.EVT_MENU, parent.genealogy_query, genealogy_item)
+        self.Bind(wx.EVT_MENU, parent.df_analysis, df_analysis_item)
+        self.Bind(wx.EVT_MENU, parent.on_search, search_item)
+        self.Bind(wx.EVT_MENU, parent.on_quit, quit_item)
+
+
+class ViewMenu(wx.Menu):
+
+    def __init__(self, parent):
+        super(ViewMenu, self).__init__()
+
+        self.shst = self.Append(wx.ID_ANY, "Show Status", "Show Status", kind=wx.ITEM_CHECK)
+        self.shtl = self.Append(wx.ID_ANY, "Show Toolbar", "Show Toolbar", kind=wx.ITEM_CHECK)
+
+        self.Check(self.shst.GetId(), True)
+        self.Check(self.shtl.GetId(), True)
+
+        self.AppendSeparator()
+        self.use_mirror = self.Append(USE_MIRROR, "Use Local Mirror", "Answer lookups from a local copy of "
+                                                                      "T3Production", kind=wx.ITEM_CHECK)
+        self.prefetch = self.Append(PREFETCH, "Prefetch Next Serials", "Retrieve the next serial numbers in the "
+                                                                       "background", kind=wx.ITEM_CHECK)
+        self.tab_limit = self.Append(TAB_LIMIT, "Open Tab Limit...", "Set the number of tabs kept in memory")
+        self.monitor = self.Append(PRODUCTION_MONITOR, "Production Monitor", "Show live transactions from all "
+                                                                             "stations")
+
+        self.log_level_menu = wx.Menu()
+        for menu_id, label, level in log_level_menu_ids:
+            self.log_level_menu.Append(menu_id, label, "Set the log level to {0}".format(label), kind=wx.ITEM_RADIO)
+            self.log_level_menu.Check(menu_id, level == logger.getEffectiveLevel())
+            self.Bind(wx.EVT_MENU, parent.set_log_level, id=menu_id)
+        self.AppendMenu(wx.ID_ANY, "Log Level", self.log_level_menu)
+
+        self.Bind(wx.EVT_MENU, parent.toggle_status_bar, self.shst)
+        self.Bind(wx.EVT_MENU, parent.toggle_tool_bar, self.shtl)
+        self.Bind(wx.EVT_MENU, parent.toggle_local_mirror, self.use_mirror)
+        self.Bind(wx.EVT_MENU, parent.toggle_prefetch, self.prefetch)
+        self.Bind(wx.EVT_MENU, parent.set_tab_limit, self.tab_limit)
+        self.Bind(wx.EVT_MENU, parent.show_production_monitor, self.monitor)
+
+
+class ResultsNotebook(fnb.FlatNotebook):
+    """
+        Notebook holding the results pages. Only the most recently viewed
+        max_live_pages ResultsPages are kept as widgets, older pages are
+        replaced by a ResultsPlaceholder holding just the beacon data and are
+        rebuilt when their tab is selected again.
+    """
+
+    def __init__(self, parent):
+        super(ResultsNotebook, self).__init__(parent)
+
+        # Notebook attributes
+        self.empty_page = wx.Panel(self)
+        self.empty_page.SetBackgroundColour("#6C727F")
+
+        self.max_live_pages = max_live_result_pages
+        self.page_lru = []
+        self.swapping_pages = False
+
+        # Setup
+        self.AddPage(self.empty_page, "< ... >")
+
+        self.Bind(fnb.EVT_FLATNOTEBOOK_PAGE_CHANGED, self.on_page_changed)
+        self.Bind(fnb.EVT_FLATNOTEBOOK_PAGE_CLOSING, self.on_page_closing)
+
+    def on_page_changed(self, e):
+        e.Skip()
+
+        if self.swapping_pages:
+            return
+
+        selection = self.GetSelection()
+        if selection >= 0:
+            self.touch_page(self.GetPage(selection))
+
+    def on_page_closing(self, e):
+        # DeletePage also sends this event when a page is swapped for its placeholder, which keeps the
+        # same render entries, so only pages closed by the user are removed from the index
+        if self.swapping_pages:
+            e.Skip()
+            return
+
+        page = self.GetPage(e.GetSelection())
+        if isinstance(page, (ResultsPage, ResultsPlaceholder)):
+            search_index.remove_entries(page.render_entries)
+        e.Skip()
+
+    def touch_page(self, page):
+        """
+            Marks the page as the most recently viewed, rebuilding it first if
+            it had been evicted, and then evicts pages over the limit.
+        :param page: Page that has been selected
+        :return: The live page
+        """
+        if isinstance(page, ResultsPlaceholder):
+            page = self.rehydrate_page(page)
+
+        if isinstance(page, ResultsPage):
+            if page in self.page_lru:
+                self.page_lru.remove(page)
+            self.page_lru.append(page)
+
+            self.evict_pages()
+
+        return page
+
+    def live_page_count(self):
+        # Drop pages which have been closed by the user
+        self.page_lru = [page for page in self.page_lru if page]
+        return len(self.page_lru)
+
+    def set_max_live_pages(self, max_live_pages):
+        self.max_live_pages = max(1, max_live_pages)
+        self.evict_pages()
+
+    def evict_pages(self):
+        """
+            Replaces the least recently viewed ResultsPages with placeholders
+            until no more than max_live_pages are live. Pages which are still
+            loading and the selected page are never evicted.
+        """
+        live_count = self.live_page_count()
+        selected = self.GetPage(self.GetSelection()) if self.GetSelection() >= 0 else None
+
+        for page in list(self.page_lru):
+            if live_count <= self.max_live_pages:
+                break
+            if page is selected or page.loading:
+                continue
+
+            logger.info("ResultsNotebook:evict_pages: evicting page for SN# %s", page.serial_number)
+            placeholder = ResultsPlaceholder(self, page.beacon_data, page.serial_number, page.node_labels,
+                                             page.render_entries)
+            self.replace_page(page, placeholder, select=False)
+            self.page_lru.remove(page)
+            live_count -= 1
+
+    def rehydrate_page(self, placeholder):
+        """
+            Rebuilds the ResultsPage for an evicted page from its stored data
+        """
+        logger.info("ResultsNotebook:rehydrate_page: rebuilding page for SN# %s", placeholder.serial_number)
+        page = ResultsPage(self, placeholder.beacon_data, placeholder.serial_number, placeholder.node_labels,
+                           placeholder.render_entries)
+        self.replace_page(placeholder, page, select=True)
+
+        return page
+
+    def replace_page(self, old_page, new_page, select):
+        index = self.GetPageIndex(old_page)
+        text = self.GetPageText(index)
+
+        self.swapping_pages = True
+        try:
+            self.InsertPage(index, new_page, text, select=select)
+            self.DeletePage(index + 1)
+            if select:
+                self.SetSelection(index)
+        finally:
+            self.swapping_pages = False
+
+
+class ResultsPlaceholder(wx.Panel):
+    """
+        Lightweight stand-in for a ResultsPage which has been evicted from
+        the ResultsNotebook. Only the beacon data and its render model are kept
+        so that the page can be rebuilt when it is selected.
+    """
+
+    def __init__(self, parent, beacon_data, serial_number, node_labels=None, render_entries=None):
+        super(ResultsPlaceholder, self).__init__(parent)
+
+        self.beacon_data = beacon_data
+        self.serial_number = serial_number
+        self.node_labels = node_labels
+        self.render_entries = render_entries
+
+        wx.StaticText(self, label="Loading SN# {0}...".format(serial_number), pos=(10, 10))
+
+
+class SerialNumberDialog(wx.Dialog):
+
+    def __init__(self, parent):
+        super(SerialNumberDialog, self).__init__(parent)
+
+        self.init_ui()
+        self.SetSize((300, 260))
+        self.SetTitle("Enter Serial Number")
+
+    def init_ui(self):
+
+        pnl = wx.Panel(self)
+        vbox = wx.BoxSizer(wx.VERTICAL)
+
+        # Main panel for serial number input
+        sb = wx.StaticBox(pnl, label="Beacon Serial Number")
+        sbs = wx.StaticBoxSizer(sb, orient=wx.VERTICAL)
+        sbs.Add(wx.StaticText(pnl, label="Enter or scan the top-level serial number of the unit."))
+        sbs.AddSpacer(10)
+
+        hbox1 = wx.BoxSizer(wx.HORIZONTAL)
+        hbox1.Add(wx.StaticText(pnl, label="Serial Number:"), flag=wx.ALIGN_CENTER)
+
+        self.sn_text = wx.TextCtrl(pnl, style=wx.TE_PROCESS_ENTER)
+        hbox1.Add(self.sn_text, flag=wx.LEFT, border=10)
+
+        sbs.Add(hbox1, flag=wx.ALIGN_CENTER)
+        sbs.AddSpacer(5)
+
+        # Completions from the serial number index
+        self.sn_list = wx.ListBox(pnl, style=wx.LB_SINGLE)
+        sbs.Add(self.sn_list, proportion=1, flag=wx.EXPAND)
+
+        pnl.SetSizer(sbs)
+
+        # Ok and cancel button panel/sizer
+        hbox2 = wx.BoxSizer(wx.HORIZONTAL)
+        ok_button = wx.Button(self, label="Ok")
+        cancel_button = wx.Button(self, label="Cancel")
+        hbox2.Add(ok_button)
+        hbox2.Add(cancel_button, flag=wx.LEFT, border=5)
+
+        # Arrange serial number input and button panels
+        vbox.Add(pnl, proportion=1, flag=wx.ALL | wx.EXPAND, border=5)
+        vbox.Add(hbox2, flag=wx.ALIGN_CENTER | wx.TOP | wx.BOTTOM, border=10)
+
+        self.SetSizer(vbox)
+
+        ok_button.Bind(wx.EVT_BUTTON, self.format_sn)
+        cancel_button.Bind(wx.EVT_BUTTON, self.on_close)
+        self.sn_text.Bind(wx.EVT_TEXT, self.on_text)
+        self.sn_text.Bind(wx.EVT_TEXT_ENTER, self.format_sn)
+        self.sn_list.Bind(wx.EVT_LISTBOX, self.on_select_completion)
+        self.sn_list.Bind(wx.EVT_LISTBOX_DCLICK, self.format_sn)
+
+    def on_text(self, e):
+        prefix = self.sn_text.GetValue().strip().upper()
+
+        if len(prefix) is 0:
+            self.sn_list.Clear()
+        else:
+            self.sn_list.Set(serial_index.prefix_matches(prefix))
+
+    def on_select_completion(self, e):
+        self.sn_text.ChangeValue(self.sn_list.GetStringSelection())
+
+    def format_sn(self, e):
+        logger.debug("SerialNumberDialog:format_sn")
+        serial_number = self.sn_text.GetValue().strip().upper()
+
+        # Check the serial number exists before running the full history query
+        if serial_index.is_loaded() and serial_number not in serial_index:
+            logger.info("SerialNumberDialog:format_sn -> %s not in serial number index", serial_number)
+            not_found = wx.MessageDialog(self, "SN# {0} was not found in Assembly Kitting (index updated {1}).\n\n"
+                                               "Query anyway?".format(serial_number,
+                                                                      format_age(serial_index.refreshed_at)),
+                                         "Serial Number Not Found", wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION)
+            answer = not_found.ShowModal()
+            not_found.Destroy()
+            if answer != wx.ID_YES:
+                return
+
+        self.serial_number = serial_number
+        logger.debug("SerialNumberDialog:format_sn -> serial number: %s", self.serial_number)
+
+        self.Destroy()
+
+    def on_close(self, e):
+        logger.debug("SerialNumberDialog:on_close")
+        self.Destroy()
+
+
+class DfTable(wx.grid.Grid):
+
+    def __init__(self, parent, df_values):
+        super(DfTable, self).__init__(parent)
+
+        self.CreateGrid(1, len(df_channel_list))
+
+        # Set column values, df_values holds the formatted values for each channel
+        col_vals = df_channel_list
+        for i in range(len(col_vals)):
+            self.SetColLabelValue(i, col_vals[i])
+            self.SetRowLabelValue(0, "DF Values:")
+            self.SetCellValue(0, i, df_values[i])
+
+        self.AutoSize()
+
+
+class ResultsPage(wx.Panel):
+    """
+        Notebook page displaying the manufacturing information for a beacon.
+        The page can be created with all of the data (e.g. from a report file)
+        or with beacon_data=None, in which case the header and an empty tree
+        are shown immediately and each table is added with add_table_result()
+        as it arrives, followed by finish_loading().
+
+        For genealogy results, node_labels maps each sub-assembly serial number
+        to its label and the entries for sub-assemblies are labelled with it.
+
+        The tree is built from RenderEntry models, which callers should build
+        off the UI thread with build_render_entries() and pass in as
+        render_entries. They are kept on the page for rebuilding and export.
+    """
+
+    def __init__(self, parent, beacon_data, serial_number, node_labels=None, render_entries=None):
+        super(ResultsPage, self).__init__(parent)
+
+        self.serial_number = serial_number
+        self.node_labels = node_labels
+        self.beacon_data = []
+        self.render_entries = []
+        self.entry_times = []
+        self.loading = True
+        self.data_time = None
+
+        pnl1 = wx.Panel(self)
+        vbox = wx.BoxSizer(wx.VERTICAL)
+
+        sb1 = wx.StaticBox(self, label="Beacon Information")
+        self.info_sizer = wx.StaticBoxSizer(sb1, orient=wx.VERTICAL)
+
+        self.header_text = wx.StaticText(self, label=self.get_header_str())
+        self.info_sizer.Add(self.header_text, flag=wx.LEFT)
+
+        if node_labels is not None:
+            genealogy_str = ", ".join("{0}: {1}".format(label, node_sn) for node_sn, label in sorted(
+                node_labels.items(), key=itemgetter(1)) if node_sn != serial_number)
+            self.info_sizer.Add(wx.StaticText(self, label="Sub-assemblies: {0}".format(genealogy_str or "None")),
+                                flag=wx.LEFT)
+
+        self.source_text = wx.StaticText(self, label="")
+        self.source_text.SetForegroundColour("#A05A00")
+        self.info_sizer.Add(self.source_text, flag=wx.LEFT)
+        self.source_text.Hide()
+
+        pnl1.SetSizer(self.info_sizer)
+
+        sb2 = wx.StaticBox(self, label="Manufacturing Information")
+        self.mfg_sizer = wx.StaticBoxSizer(sb2, orient=wx.VERTICAL)
+
+        self.status_text = wx.StaticText(self, label="Retrieving data from T3Production...")
+        self.mfg_sizer.Add(self.status_text, flag=wx.LEFT, border=10)
+
+        self.results_tree = wx.TreeCtrl(self, style=wx.TR_DEFAULT_STYLE | wx.TR_HIDE_ROOT | wx.TR_TWIST_BUTTONS)
+        self.tree_root = self.results_tree.AddRoot("Mfg Data")
+        self.mfg_sizer.Add(self.results_tree, 1, wx.EXPAND)
+
+        vbox.Add(pnl1, flag=wx.ALL | wx.EXPAND)
+        vbox.AddSpacer(10)
+        vbox.Add(self.mfg_sizer, proportion=1, flag=wx.ALIGN_CENTER | wx.EXPAND)
+
+        self.SetSizer(vbox)
+
+        if beacon_data is not None:
+            if render_entries is None:
+                render_entries = build_render_entries(beacon_data, serial_number, node_labels)
+            self.add_render_entries(render_entries)
+            self.finish_loading()
+
+    def get_header_str(self):
+        """
+            Returns the Beacon Information string, displaying N/A for the
+            transaction time if no information has been found
+        """
+        if len(self.beacon_data) is not 0:
+            return "Serial Number: {0}, First Scanned: {1}".format(self.serial_number,
+                                                                 self.beacon_data[0]["transactionTime"])
+        else:
+            return "Serial Number: {0}, First Scanned: N/A".format(self.serial_number)
+
+    def add_table_result(self, table_result, render_entries):
+        """
+            Adds the rows of a single DB table to the page
+        :param table_result: TableResult for one of the tables in db_table_list
+        :param render_entries: RenderEntry list built from the table_result rows
+        """
+        logger.debug("ResultsPage:add_table_result: %s -> %s rows", table_result.db_table, len(table_result.rows))
+
+        # Show how old the data is when it has not come straight from T3Production
+        if table_result.source != "T3Production" and table_result.retrieved_at is not None:
+            if self.data_time is None or table_result.retrieved_at < self.data_time:
+                self.data_time = table_result.retrieved_at
+
+            if table_result.source == "stale cache":
+                source_str = "STALE: T3Production unavailable, showing results retrieved {0} ({1})"
+            else:
+                source_str = "From local mirror, last synced {0} ({1})"
+            self.source_text.SetLabel(source_str.format(self.data_time.strftime("%Y-%m-%d %H:%M"),
+                                                        format_age(self.data_time)))
+            self.source_text.Show()
+            self.Layout()
+
+        self.add_render_entries(render_entries)
+
+    def add_render_entries(self, render_entries):
+        """
+            Inserts the entries into the tree in transactionTime order. All of
+            the tree updates are made in a single Freeze/Thaw batch.
+        :param render_entries: RenderEntry list to add
+        """
+        if len(render_entries) is 0:
+            return
+
+        self.Freeze()
+        try:
+            for render_entry in render_entries:
+                self.insert_render_entry(render_entry)
+
+            self.header_text.SetLabel(self.get_header_str())
+        finally:
+            self.Thaw()
+
+        self.Layout()
+
+    def insert_render_entry(self, render_entry):
+        # Generate DF data table
+        if render_entry.df_values is not None:
+            df_table = DfTable(self, render_entry.df_values)
+            self.info_sizer.AddSpacer(5)
+            self.info_sizer.Add(df_table)
+
+        # Keep entries ordered by transactionTime, entries with equal times are kept in arrival order
+        index = bisect.bisect_right(self.entry_times, render_entry.transaction_time)
+        self.entry_times.insert(index, render_entry.transaction_time)
+        self.beacon_data.insert(index, render_entry.entry)
+        self.render_entries.insert(index, render_entry)
+
+        # Add DB tables
+        table_item = self.results_tree.InsertItemBefore(self.tree_root, index, render_entry.node.label)
+        self.append_render_nodes(table_item, render_entry.node)
+
+    def append_render_nodes(self, parent_item, parent_node):
+        for node in parent_node.children:
+            item = self.results_tree.AppendItem(parent_item, node.label)
+            self.append_render_nodes(item, node)
+
+        if parent_node.expanded:
+            self.results_tree.Expand(parent_item)
+
+    def select_render_entry(self, render_entry):
+        """
+            Selects and scrolls to the tree item of a record on the page
+        :return: True if the record is on the page
+        """
+        for index, page_entry in enumerate(self.render_entries):
+            if page_entry is render_entry:
+                break
+        else:
+            return False
+
+        # Tree items are kept in the same order as render_entries
+        item, cookie = self.results_tree.GetFirstChild(self.tree_root)
+        for _ in xrange(index):
+            item, cookie = self.results_tree.GetNextChild(self.tree_root, cookie)
+
+        self.results_tree.Expand(item)
+        self.results_tree.SelectItem(item)
+        self.results_tree.ScrollTo(item)
+        self.results_tree.SetFocus()
+
+        return True
+
+    def finish_loading(self, error_str=None):
+        """
+            Called once all of the DB tables have been added to the page
+        :param error_str: Error message to display if the data could not be retrieved
+        """
+        self.loading = False
+
+        self.Freeze()
+        try:
+            if error_str is not None:
+                self.status_text.SetLabel(error_str)
+            elif len(self.beacon_data) is 0:
+                # Check if no information was found
+                self.status_text.SetLabel("No data found")
+                self.results_tree.Hide()
+            else:
+                self.status_text.Hide()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("ResultsPage: quick best size = %s", self.results_tree.GetQuickBestSize())
+                self.results_tree.SetQuickBestSize(self.results_tree.GetQuickBestSize())
+        finally:
+            self.Thaw()
+
+        self.Layout()
+
+
+class SerialListDialog(wx.Dialog):
+    """
+        Dialog for entering a list of serial numbers, either scanned one per
+        line or pasted in separated by spaces or commas.
+    """
+
+    def __init__(self, parent, title):
+        super(SerialListDialog, self).__init__(parent, style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+
+        self.serial_numbers = []
+
+        self.init_ui()
+        self.SetSize((320, 360))
+        self.SetTitle(title)
+
+    def init_ui(self):
+
+        pnl = wx.Panel(self)
+        vbox = wx.BoxSizer(wx.VERTICAL)
+
+        sb = wx.StaticBox(pnl, label="Beacon Serial Numbers")
+        sbs = wx.StaticBoxSizer(sb, orient=wx.VERTICAL)
+        sbs.Add(wx.StaticText(pnl, label="Enter, scan or paste the top-level serial numbers, one per line."))
+        sbs.AddSpacer(10)
+
+        self.sn_text = wx.TextCtrl(pnl, style=wx.TE_MULTILINE)
+        sbs.Add(self.sn_text, proportion=1, flag=wx.EXPAND)
+
+        pnl.SetSizer(sbs)
+
+        # Ok and cancel button panel/sizer
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        ok_button = wx.Button(self, label="Ok")
+        cancel_button = wx.Button(self, label="Cancel")
+        hbox.Add(ok_button)
+        hbox.Add(cancel_button, flag=wx.LEFT, border=5)
+
+        vbox.Add(pnl, proportion=1, flag=wx.ALL | wx.EXPAND, border=5)
+        vbox.Add(hbox, flag=wx.ALIGN_CENTER | wx.TOP | wx.BOTTOM, border=10)
+
+        self.SetSizer(vbox)
+
+        ok_button.Bind(wx.EVT_BUTTON, self.on_ok)
+        cancel_button.Bind(wx.EVT_BUTTON, self.on_close)
+
+    def on_ok(self, e):
+        self.serial_numbers = parse_serial_numbers(self.sn_text.GetValue())
+        logger.debug("SerialListDialog:on_ok -> %s serial numbers", len(self.serial_numbers))
+        self.EndModal(wx.ID_OK)
+
+    def on_close(self, e):
+        self.EndModal(wx.ID_CANCEL)
+
+
+class DfAnalysis(object):
+    """
+        Statistics for the DF values of a batch of beacons. All of the values
+        are held in an (rows x channels) NumPy array with NaN for missing or
+        non-numeric values, and every statistic is computed per channel in a
+        single vectorized pass.
+
+        Outliers are values whose robust z-score (distance from the median in
+        units of the scaled median absolute deviation) exceeds the threshold.
+        Drift is the least-squares slope of each channel against
+        transactionTime, in units per day.
+    """
+    percentiles = (5, 25, 50, 75, 95)
+
+    def __init__(self, serial_numbers, transaction_times, values, threshold=None):
+        self.serial_numbers = serial_numbers
+        self.transaction_times = transaction_times
+        self.values = values
+        self.threshold = df_outlier_threshold if threshold is None else threshold
+
+        valid = ~numpy.isnan(values)
+
+        # Convert the transaction times to days, NaT is stored as the minimum int64. Rows without a
+        # transactionTime are only left out of the drift.
+        times = numpy.array(transaction_times, dtype="datetime64[us]").astype("int64")
+        timed = valid & (times != numpy.iinfo(numpy.int64).min)[:, None]
+        days = times / 86400e6
+
+        with warnings.catch_warnings():
+            # All-NaN channels are expected for empty batches
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            with numpy.errstate(invalid="ignore", divide="ignore"):
+                self.count = valid.sum(axis=0)
+                self.mean = numpy.nanmean(values, axis=0)
+                self.std = numpy.nanstd(values, axis=0)
+                self.min = numpy.nanmin(values, axis=0) if len(values) else numpy.full(values.shape[1], numpy.nan)
+                self.max = numpy.nanmax(values, axis=0) if len(values) else numpy.full(values.shape[1], numpy.nan)
+                self.percentile_values = numpy.nanpercentile(values, self.percentiles, axis=0)
 
-    def __init__(self, parent):
-        super(CustomTaskBarIcon, self).__init__()
+                median = self.percentile_values[self.percentiles.index(50)]
+                scale = 1.4826 * numpy.nanmedian(numpy.abs(values - median), axis=0)
+                scale = numpy.where(scale > 0, scale, self.std)
 
-        self.parent = parent
+                self.robust_z = (values - median) / scale
+                self.outliers = numpy.abs(self.robust_z) > self.threshold
 
-        # Setup
-        ico = wx.Icon(app_icon, wx.BITMAP_TYPE_PNG)
-        self.SetIcon(ico)
-        self.parent.SetIcon(ico)
+                timed_count = timed.sum(axis=0)
+                d_days = numpy.where(timed, days[:, None] - (numpy.where(timed, days[:, None], 0).sum(axis=0) /
+                                                             timed_count), 0)
+                d_values = numpy.where(timed, values - numpy.where(timed, values, 0).sum(axis=0) / timed_count, 0)
+                self.drift = (d_days * d_values).sum(axis=0) / (d_days * d_days).sum(axis=0)
 
-        # Event Handlers
-        self.Bind(wx.EVT_MENU, self.on_menu)
+        self.flagged_rows = numpy.flatnonzero(self.outliers.any(axis=1))
+        self.flagged_serial_numbers = sorted(set(serial_numbers[index] for index in self.flagged_rows))
 
-    def create_popup_menu(self):
+    def __len__(self):
+        return len(self.values)
+
+    def unit_count(self):
+        return len(set(self.serial_numbers))
+
+    def stat_rows(self):
         """
-            Base class virtual method for creating the popup menu for the icon
+            Returns a list of (label, per-channel array) tuples summarising
+            the batch
         """
-        menu = wx.Menu()
-        menu.Append(NEW_QUERY, "New Query")
-        menu.Append(SAVE_RESULTS, "Save Results")
-        menu.AppendSeparator()
-        menu.Append(APP_EXIT, "Exit")
+        rows = [("Count", self.count), ("Mean", self.mean), ("Std Dev", self.std), ("Min", self.min)]
+        for index, percentile in enumerate(self.percentiles):
+            rows.append(("P{0}".format(percentile), self.percentile_values[index]))
+        rows.extend([("Max", self.max), ("Outliers", self.outliers.sum(axis=0)), ("Drift / Day", self.drift)])
 
-        return menu
+        return rows
 
-    def on_menu(self, e):
-        evt_id = e.GetId()
+    def outlier_channels(self, row):
+        return [df_channel_list[col] for col in numpy.flatnonzero(self.outliers[row])]
 
-        if evt_id == NEW_QUERY:
-            self.parent.new_query()
-        elif evt_id == SAVE_RESULTS:
-            self.parent.save_results()
-        elif evt_id == APP_EXIT:
-            self.parent.on_quit()
-        else:
-            e.Skip()
 
+class DfAnalysisGridTable(wx.grid.PyGridTableBase):
+    """
+        Virtual grid table for the rows of a DfAnalysis, cells are only
+        formatted when the grid draws them so large batches stay responsive.
+        Outlier values are highlighted.
+    """
 
-class FileMenu(wx.Menu):
+    def __init__(self, analysis):
+        super(DfAnalysisGridTable, self).__init__()
 
-    def __init__(self, parent):
-        super(FileMenu, self).__init__()
+        self.analysis = analysis
+        self.row_index = numpy.arange(len(analysis))
+        self.col_labels = ["Serial Number", "Transaction Time"] + df_channel_list + ["Outliers"]
 
-        new_query_item = wx.MenuItem(self, NEW_QUERY, "&New Query\tCtrl+N")
-        new_query_item.SetBitmap(wx.Bitmap("icons\search25.png"))
+        self.outlier_attr = wx.grid.GridCellAttr()
+        self.outlier_attr.SetBackgroundColour("#F4C7C3")
 
-        open_file_item = wx.MenuItem(self, OPEN_FILE, "&Open Report File\tCtrl+O")
-        open_file_item.SetBitmap(wx.Bitmap("icons\\add25.png"))
+    def GetNumberRows(self):
+        return len(self.row_index)
 
-        save_results_item = wx.MenuItem(self, SAVE_RESULTS, "&Save Results\tCtrl+S")
-        save_results_item.SetBitmap(wx.Bitmap("icons\down25.png"))
+    def GetNumberCols(self):
+        return len(self.col_labels)
 
-        quit_item = wx.MenuItem(self, APP_EXIT, "&Quit\tCtrl+Q")
-        quit_item.SetBitmap(wx.Bitmap("icons\close25.png"))
+    def GetColLabelValue(self, col):
+        return self.col_labels[col]
 
-        # Append Menu Items
-        self.AppendItem(new_query_item)
-        self.AppendItem(open_file_item)
-        self.AppendItem(save_results_item)
-        self.AppendSeparator()
-        self.AppendItem(quit_item)
+    def GetRowLabelValue(self, row):
+        return str(self.row_index[row] + 1)
 
-        # Bind Menu Items
-        self.Bind(wx.EVT_MENU, parent.new_query, new_query_item)
-        self.Bind(wx.EVT_MENU, parent.save_results, save_results_item)
-        self.Bind(wx.EVT_MENU, parent.on_quit, quit_item)
+    def IsEmptyCell(self, row, col):
+        return False
 
+    def GetValue(self, row, col):
+        index = self.row_index[row]
 
-class ViewMenu(wx.Menu):
+        if col == 0:
+            return str(self.analysis.serial_numbers[index])
+        elif col == 1:
+            return str(self.analysis.transaction_times[index])
+        elif col == len(self.col_labels) - 1:
+            return ", ".join(self.analysis.outlier_channels(index))
+        else:
+            value = self.analysis.values[index, col - 2]
+            return "N/A" if numpy.isnan(value) else "{0:g}".format(value)
 
-    def __init__(self, parent):
-        super(ViewMenu, self).__init__()
+    def SetValue(self, row, col, value):
+        pass
 
-        self.shst = self.Append(wx.ID_ANY, "Show Status", "Show Status", kind=wx.ITEM_CHECK)
-        self.shtl = self.Append(wx.ID_ANY, "Show Toolbar", "Show Toolbar", kind=wx.ITEM_CHECK)
+    def GetAttr(self, row, col, kind):
+        channel = col - 2
+        if 0 <= channel < len(df_channel_list) and self.analysis.outliers[self.row_index[row], channel]:
+            self.outlier_attr.IncRef()
+            return self.outlier_attr
+        return None
 
-        self.Check(self.shst.GetId(), True)
-        self.Check(self.shtl.GetId(), True)
+    def set_flagged_only(self, grid, flagged_only):
+        """
+            Switches between showing every row and only rows with outliers
+        """
+        old_count = self.GetNumberRows()
+        if flagged_only:
+            self.row_index = self.analysis.flagged_rows
+        else:
+            self.row_index = numpy.arange(len(self.analysis))
 
-        self.Bind(wx.EVT_MENU, parent.toggle_status_bar, self.shst)
-        self.Bind(wx.EVT_MENU, parent.toggle_tool_bar, self.shtl)
+        grid.BeginBatch()
+        grid.ProcessTableMessage(wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_DELETED, 0, old_count))
+        grid.ProcessTableMessage(wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED,
+                                                          self.GetNumberRows()))
+        grid.EndBatch()
+        grid.ForceRefresh()
 
 
-class ResultsNotebook(fnb.FlatNotebook):
+class DfAnalysisPage(wx.Panel):
+    """
+        Notebook page displaying the DF statistics for a batch of beacons
+    """
 
-    def __init__(self, parent):
-        super(ResultsNotebook, self).__init__(parent)
+    def __init__(self, parent, analysis):
+        super(DfAnalysisPage, self).__init__(parent)
 
-        # Notebook attributes
-        self.empty_page = wx.Panel(self)
-        self.empty_page.SetBackgroundColour("#6C727F")
+        self.analysis = analysis
 
-        # Setup
-        self.AddPage(self.empty_page, "< ... >")
+        vbox = wx.BoxSizer(wx.VERTICAL)
 
+        sb1 = wx.StaticBox(self, label="DF Calibration Summary")
+        sb1s = wx.StaticBoxSizer(sb1, orient=wx.VERTICAL)
 
-class SerialNumberDialog(wx.Dialog):
+        summary_str = "{0} DF rows, {1} units, {2} units flagged (robust z-score > {3:g})".format(
+            len(analysis), analysis.unit_count(), len(analysis.flagged_serial_numbers), analysis.threshold)
+        sb1s.Add(wx.StaticText(self, label=summary_str), flag=wx.LEFT)
+        sb1s.AddSpacer(5)
+
+        stat_rows = analysis.stat_rows()
+        stats_grid = wx.grid.Grid(self)
+        stats_grid.CreateGrid(len(stat_rows), len(df_channel_list))
+        stats_grid.EnableEditing(False)
+        for col, channel in enumerate(df_channel_list):
+            stats_grid.SetColLabelValue(col, channel)
+        for row, (label, stat_values) in enumerate(stat_rows):
+            stats_grid.SetRowLabelValue(row, label)
+            for col in range(len(df_channel_list)):
+                stats_grid.SetCellValue(row, col, "{0:.6g}".format(stat_values[col]))
+        stats_grid.AutoSize()
+        sb1s.Add(stats_grid)
+
+        sb2 = wx.StaticBox(self, label="DF Values")
+        sb2s = wx.StaticBoxSizer(sb2, orient=wx.VERTICAL)
 
-    def __init__(self, parent):
-        super(SerialNumberDialog, self).__init__(parent)
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        self.flagged_check = wx.CheckBox(self, label="Show flagged rows only")
+        export_button = wx.Button(self, label="Export CSV...")
+        hbox.Add(self.flagged_check, flag=wx.ALIGN_CENTER)
+        hbox.AddStretchSpacer()
+        hbox.Add(export_button)
+        sb2s.Add(hbox, flag=wx.EXPAND | wx.BOTTOM, border=5)
+
+        self.rows_grid = wx.grid.Grid(self)
+        self.rows_table = DfAnalysisGridTable(analysis)
+        self.rows_grid.SetTable(self.rows_table, True)
+        self.rows_grid.EnableEditing(False)
+        self.rows_grid.AutoSizeColumns(False)
+        sb2s.Add(self.rows_grid, proportion=1, flag=wx.EXPAND)
+
+        vbox.Add(sb1s, flag=wx.ALL | wx.EXPAND)
+        vbox.AddSpacer(10)
+        vbox.Add(sb2s, proportion=1, flag=wx.EXPAND)
 
-        self.init_ui()
-        self.SetSize((300, 160))
-        self.SetTitle("Enter Serial Number")
+        self.SetSizer(vbox)
 
-    def init_ui(self):
+        self.flagged_check.Bind(wx.EVT_CHECKBOX, self.on_flagged_only)
+        export_button.Bind(wx.EVT_BUTTON, self.on_export)
 
-        pnl = wx.Panel(self)
-        vbox = wx.BoxSizer(wx.VERTICAL)
+    def on_flagged_only(self, e):
+        self.rows_table.set_flagged_only(self.rows_grid, self.flagged_check.IsChecked())
 
-        # Main panel for serial number input
-        sb = wx.StaticBox(pnl, label="Beacon Serial Number")
-        sbs = wx.StaticBoxSizer(sb, orient=wx.VERTICAL)
-        sbs.Add(wx.StaticText(pnl, label="Enter or scan the top-level serial number of the unit."))
-        sbs.AddSpacer(10)
+    def on_export(self, e):
+        save_diag = wx.FileDialog(self, "Export DF Analysis", "", "", "CSV files (*.csv)|*.csv", wx.FD_SAVE |
+                                  wx.FD_OVERWRITE_PROMPT)
 
-        hbox1 = wx.BoxSizer(wx.HORIZONTAL)
-        hbox1.Add(wx.StaticText(pnl, label="Serial Number:"), flag=wx.ALIGN_CENTER)
+        if save_diag.ShowModal() == wx.ID_CANCEL:
+            logger.debug("DfAnalysisPage:on_export: user canceled action")
+            return
 
-        self.sn_text = wx.TextCtrl(pnl)
-        hbox1.Add(self.sn_text, flag=wx.LEFT, border=10)
+        logger.debug("DfAnalysisPage:on_export: path=%s", save_diag.GetPath())
+        save_df_analysis_csv(save_diag.GetPath(), self.analysis)
 
-        sbs.Add(hbox1, flag=wx.ALIGN_CENTER)
 
-        pnl.SetSizer(sbs)
+class DiagnosticsDialog(wx.Dialog):
+    """
+        Dialog listing the database and application diagnostics returned by
+        MainWindow.get_diagnostics()
+    """
 
-        # Ok and cancel button panel/sizer
-        hbox2 = wx.BoxSizer(wx.HORIZONTAL)
-        ok_button = wx.Button(self, label="Ok")
-        cancel_button = wx.Button(self, label="Cancel")
-        hbox2.Add(ok_button)
-        hbox2.Add(cancel_button, flag=wx.LEFT, border=5)
+    def __init__(self, parent):
+        super(DiagnosticsDialog, self).__init__(parent, style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
 
-        # Arrange serial number input and button panels
-        vbox.Add(pnl, proportion=1, flag=wx.ALL | wx.EXPAND, border=5)
-        vbox.Add(hbox2, flag=wx.ALIGN_CENTER | wx.TOP | wx.BOTTOM, border=10)
+        self.parent = parent
+
+        self.SetTitle("Diagnostics")
+        vbox = wx.BoxSizer(wx.VERTICAL)
+
+        self.diag_list = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.diag_list.InsertColumn(0, "Name", width=160)
+        self.diag_list.InsertColumn(1, "Value", width=220)
 
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        refresh_button = wx.Button(self, label="Refresh")
+        close_button = wx.Button(self, label="Close")
+        hbox.Add(refresh_button)
+        hbox.Add(close_button, flag=wx.LEFT, border=5)
+
+        vbox.Add(self.diag_list, proportion=1, flag=wx.ALL | wx.EXPAND, border=5)
+        vbox.Add(hbox, flag=wx.ALIGN_CENTER | wx.TOP | wx.BOTTOM, border=10)
         self.SetSizer(vbox)
 
-        ok_button.Bind(wx.EVT_BUTTON, self.format_sn)
-        cancel_button.Bind(wx.EVT_BUTTON, self.on_close)
+        refresh_button.Bind(wx.EVT_BUTTON, self.on_refresh)
+        close_button.Bind(wx.EVT_BUTTON, self.on_close)
 
-    def format_sn(self, e):
-        logger.debug("SerialNumberDialog:format_sn")
-        self.serial_number = self.sn_text.GetValue().upper()
-        logger.debug("SerialNumberDialog:format_sn -> serial number: {0}".format(self.serial_number))
+        self.on_refresh(None)
+        self.SetSize((420, 380))
 
-        self.Destroy()
+    def on_refresh(self, e):
+        self.diag_list.DeleteAllItems()
+        for name, value in self.parent.get_diagnostics():
+            index = self.diag_list.InsertStringItem(self.diag_list.GetItemCount(), name)
+            self.diag_list.SetStringItem(index, 1, value)
 
     def on_close(self, e):
-        logger.debug("SerialNumberDialog:on_close")
-        self.Destroy()
+        self.EndModal(wx.ID_CLOSE)
 
 
-class DfTable(wx.grid.Grid):
+class MonitorPage(wx.Panel):
+    """
+        Notebook page displaying the live ProductionMonitor window. The
+        monitor is stopped when the page is closed.
+    """
 
-    def __init__(self, parent, beacon_data):
-        super(DfTable, self).__init__(parent)
+    def __init__(self, parent, monitor):
+        super(MonitorPage, self).__init__(parent)
 
-        self.CreateGrid(1, 7)
+        self.monitor = monitor
 
-        # Set column values
-        col_vals = ["VL", "AL", "VX", "AX", "VY", "AY", "VN"]
-        for i in range(len(col_vals)):
-            self.SetColLabelValue(i, col_vals[i])
-            self.SetRowLabelValue(0, "DF Values:")
+        vbox = wx.BoxSizer(wx.VERTICAL)
 
-            try:
-                self.SetCellValue(0, i, str(beacon_data[col_vals[i]]).upper())
-            except KeyError:
-                self.SetCellValue(0, i, "N/A")
+        self.summary_text = wx.StaticText(self, label="Waiting for first poll...")
+        vbox.Add(self.summary_text, flag=wx.ALL, border=5)
 
-        self.AutoSize()
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
 
+        sb1 = wx.StaticBox(self, label="Stations")
+        sb1s = wx.StaticBoxSizer(sb1, orient=wx.VERTICAL)
+        self.station_list = wx.ListCtrl(self, style=wx.LC_REPORT)
+        self.station_list.InsertColumn(0, "Station", width=130)
+        self.station_list.InsertColumn(1, "Count", width=60)
+        self.station_list.InsertColumn(2, "Failures", width=60)
+        sb1s.Add(self.station_list, proportion=1, flag=wx.EXPAND)
 
-class ResultsPage(wx.Panel):
+        sb2 = wx.StaticBox(self, label="Failure Codes")
+        sb2s = wx.StaticBoxSizer(sb2, orient=wx.VERTICAL)
+        self.failure_list = wx.ListCtrl(self, style=wx.LC_REPORT)
+        self.failure_list.InsertColumn(0, "Code", width=50)
+        self.failure_list.InsertColumn(1, "Description", width=150)
+        self.failure_list.InsertColumn(2, "Count", width=50)
+        sb2s.Add(self.failure_list, proportion=1, flag=wx.EXPAND)
+
+        hbox.Add(sb1s, proportion=1, flag=wx.EXPAND | wx.RIGHT, border=5)
+        hbox.Add(sb2s, proportion=1, flag=wx.EXPAND)
+
+        sb3 = wx.StaticBox(self, label="Recent Transactions")
+        sb3s = wx.StaticBoxSizer(sb3, orient=wx.VERTICAL)
+        self.recent_list = wx.ListCtrl(self, style=wx.LC_REPORT)
+        self.recent_list.InsertColumn(0, "Time", width=140)
+        self.recent_list.InsertColumn(1, "Station", width=120)
+        self.recent_list.InsertColumn(2, "Serial Number", width=110)
+        self.recent_list.InsertColumn(3, "Failure Code", width=80)
+        sb3s.Add(self.recent_list, proportion=1, flag=wx.EXPAND)
+
+        vbox.Add(hbox, proportion=1, flag=wx.EXPAND)
+        vbox.AddSpacer(5)
+        vbox.Add(sb3s, proportion=1, flag=wx.EXPAND)
 
-    def __init__(self, parent, beacon_data, serial_number):
-        super(ResultsPage, self).__init__(parent)
+        self.SetSizer(vbox)
 
-        pnl1 = wx.Panel(self)
-        vbox = wx.BoxSizer(wx.VERTICAL)
+        self.refresh_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_refresh, self.refresh_timer)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
+        self.refresh_timer.Start(monitor_refresh_ms)
 
-        sb1 = wx.StaticBox(self, label="Beacon Information")
-        sb1s = wx.StaticBoxSizer(sb1, orient=wx.VERTICAL)
+    def on_destroy(self, e):
+        if e.GetEventObject() is self:
+            self.refresh_timer.Stop()
+            self.monitor.stop()
+        e.Skip()
 
-        # Set Beacon Information string, display N/A for transaction time if no
-        # information was found
-        if len(beacon_data) is not 0:
-            header_str = "Serial Number: {0}, First Scanned: {1}".format(serial_number,
-                                                                         beacon_data[0]["transactionTime"])
-        else:
-            header_str = "Serial Number: {0}, First Scanned: N/A".format(serial_number)
+    def on_refresh(self, e):
+        monitor = self.monitor
+        if monitor.last_poll_time is None and monitor.poll_error is None:
+            return
 
-        sb1s.Add(wx.StaticText(self, label=header_str), flag=wx.LEFT)
+        snapshot = monitor.snapshot()
 
-        # Generate DF data table
-        for table_entry in beacon_data:
-            if table_entry["db_table"] == "DFTestingTable":
-                df_table = DfTable(self, table_entry)
-                sb1s.AddSpacer(5)
-                sb1s.Add(df_table)
+        summary_str = "Last {0} h: {1} transactions, {2} fallouts. Polling every {3:.0f} s".format(
+            monitor.window_hours, snapshot["total"], snapshot["fallouts"], monitor.poll_interval_s)
+        if monitor.poll_error is not None:
+            summary_str += " (T3Production unavailable)"
+        elif monitor.last_poll_time is not None:
+            summary_str += ", last poll {0}".format(monitor.last_poll_time.strftime("%H:%M:%S"))
 
-        pnl1.SetSizer(sb1s)
+        self.Freeze()
+        try:
+            self.summary_text.SetLabel(summary_str)
+
+            self.station_list.DeleteAllItems()
+            for table in db_table_list:
+                index = self.station_list.InsertStringItem(self.station_list.GetItemCount(),
+                                                           format_db_table_str(table))
+                self.station_list.SetStringItem(index, 1, str(snapshot["station_counts"].get(table, 0)))
+                self.station_list.SetStringItem(index, 2, str(snapshot["station_failures"].get(table, 0)))
+
+            self.failure_list.DeleteAllItems()
+            for failure_code, count in snapshot["failure_counts"]:
+                index = self.failure_list.InsertStringItem(self.failure_list.GetItemCount(), str(failure_code))
+                self.failure_list.SetStringItem(index, 1, failure_description_cache.get(failure_code, ""))
+                self.failure_list.SetStringItem(index, 2, str(count))
+
+            self.recent_list.DeleteAllItems()
+            for transaction_time, table, serial_number, failure_code in snapshot["recent"]:
+                index = self.recent_list.InsertStringItem(self.recent_list.GetItemCount(), str(transaction_time))
+                self.recent_list.SetStringItem(index, 1, format_db_table_str(table))
+                self.recent_list.SetStringItem(index, 2, str(serial_number))
+                self.recent_list.SetStringItem(index, 3, "" if failure_code is None else str(failure_code))
+        finally:
+            self.Thaw()
+
+
+class SearchDialog(wx.Dialog):
+    """
+        Modeless dialog for searching the records of the open results pages.
+        Activating a result selects its tab and tree item.
+    """
 
-        sb2 = wx.StaticBox(self, label="Manufacturing Information")
-        sb2s = wx.StaticBoxSizer(sb2, orient=wx.VERTICAL)
+    def __init__(self, parent):
+        super(SearchDialog, self).__init__(parent, style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
 
-        # Check if no information was found
-        if len(beacon_data) is 0:
-            sb2s.Add(wx.StaticText(self, label="No data found"), flag=wx.LEFT, border=10)
-        else:
-            # Populate the manufacturing data entries
-            results_tree = wx.TreeCtrl(self, style=wx.TR_DEFAULT_STYLE | wx.TR_HIDE_ROOT | wx.TR_TWIST_BUTTONS)
-            root = results_tree.AddRoot("Mfg Data")
-
-            for entry in beacon_data:
-                logger.debug("ResultsPage: add entry {0}".format(entry))
-                print entry["db_table"]
-                db_table_str = format_db_table_str(entry["db_table"])
-
-                # Add DB tables
-                table_entry = results_tree.AppendItem(root, "{0}: {1}".format(entry["transactionTime"], db_table_str))
-
-                # Add all of the keys for the selected DB table
-                for key in sorted(entry):
-                    if key in ["db_table", "transactionID", "transactionTime", "serialNumber"]:
-                        pass
-                    elif key == "employeeID":
-                        # Retrieve Employee Name to display
-                        logger.debug("ResultsPage: key={0}, data={1}".format(key, entry[key]))
-                        temp_key = results_tree.AppendItem(table_entry, format_column_str(key))
-                        results_tree.AppendItem(temp_key, get_employee_name(entry[key]))
-                    elif key == "failureCode":
-                        if entry["failureCode"] == 0 or entry["failureCode"] is None:
-                            pass
-                        else:
-                            logger.debug("ResultsPage: key={0}, data={1}".format(key, entry[key]))
-                            temp_key = results_tree.AppendItem(table_entry, format_column_str(key))
-                            results_tree.AppendItem(temp_key, "{0}: {1}".format(str(entry[key]),
-                                                                                get_failure_description(entry[key])))
-                            results_tree.ExpandAllChildren(temp_key)
-                            results_tree.Expand(table_entry)
-                    elif key == "failureDescription":
-                        if entry["failureDescription"] == "Pass" or entry["failureDescription"] is None:
-                            pass
-                        else:
-                            logger.debug("ResultsPage: key={0}, data={1}".format(key, entry[key]))
-
-                            # Format failureDescription String
-                            # Multiple strings can be entered, so these are split and then multiple entries
-                            # are made within the Failure Description Page.
-                            failure_str = str(entry[key]).split("\r\n")
-
-                            temp_key = results_tree.AppendItem(table_entry, format_column_str(key))
-
-                            for failure in failure_str:
-                                results_tree.AppendItem(temp_key, failure)
-                            results_tree.ExpandAllChildren(temp_key)
-                            results_tree.Expand(table_entry)
-                    else:
-                        logger.debug("ResultsPage: key={0}, data={1}".format(key, entry[key]))
-                        temp_key = results_tree.AppendItem(table_entry, format_column_str(key))
-                        results_tree.AppendItem(temp_key, str(entry[key]))
+        self.parent = parent
+        self.results = []
 
-            logger.debug("ResultsPage: quick best size = {0}".format(results_tree.GetQuickBestSize()))
-            results_tree.SetQuickBestSize(results_tree.GetQuickBestSize())
-            sb2s.Add(results_tree, 1, wx.EXPAND)
-        sb2s.RecalcSizes()
+        self.SetTitle("Search Loaded Records")
+        vbox = wx.BoxSizer(wx.VERTICAL)
 
-        vbox.Add(pnl1, flag=wx.ALL | wx.EXPAND)
-        vbox.AddSpacer(10)
-        vbox.Add(sb2s, proportion=1, flag=wx.ALIGN_CENTER | wx.EXPAND)
+        vbox.Add(wx.StaticText(self, label="Search terms, e.g. \"code:42\", \"antenna\" or \"table:fallout "
+                                           "employee:smith\""), flag=wx.ALL, border=5)
+        self.search_text = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER)
+        vbox.Add(self.search_text, flag=wx.LEFT | wx.RIGHT | wx.EXPAND, border=5)
 
+        self.result_list = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.result_list.InsertColumn(0, "Serial Number", width=110)
+        self.result_list.InsertColumn(1, "Time", width=140)
+        self.result_list.InsertColumn(2, "Station", width=120)
+        self.result_list.InsertColumn(3, "Failure", width=200)
+        vbox.Add(self.result_list, proportion=1, flag=wx.ALL | wx.EXPAND, border=5)
+
+        self.count_text = wx.StaticText(self, label="")
+        vbox.Add(self.count_text, flag=wx.LEFT, border=5)
+
+        close_button = wx.Button(self, label="Close")
+        vbox.Add(close_button, flag=wx.ALIGN_CENTER | wx.TOP | wx.BOTTOM, border=10)
         self.SetSizer(vbox)
 
+        self.search_text.Bind(wx.EVT_TEXT, self.on_search)
+        self.result_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_activate)
+        close_button.Bind(wx.EVT_BUTTON, self.on_close)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+
+        self.SetSize((620, 420))
+
+    def on_search(self, e):
+        query = self.search_text.GetValue()
+        self.results = search_index.search(query, search_result_limit)
+        logger.debug("SearchDialog:on_search: %s -> %s results", query, len(self.results))
+
+        self.result_list.Freeze()
+        try:
+            self.result_list.DeleteAllItems()
+            for render_entry in self.results:
+                entry = render_entry.entry
+                db_table = entry["db_table"]
+                failure_str = ""
+                if entry.get("failureCode"):
+                    failure_str = "{0}: {1}".format(entry["failureCode"],
+                                                    failure_description_cache.get(entry["failureCode"], ""))
+
+                index = self.result_list.InsertStringItem(self.result_list.GetItemCount(),
+                                                          str(entry.get(get_serial_number_column(db_table))))
+                self.result_list.SetStringItem(index, 1, str(render_entry.transaction_time))
+                self.result_list.SetStringItem(index, 2, format_db_table_str(db_table))
+                self.result_list.SetStringItem(index, 3, failure_str)
+        finally:
+            self.result_list.Thaw()
+
+        if len(query.strip()) is 0:
+            self.count_text.SetLabel("")
+        else:
+            self.count_text.SetLabel("{0} matching records in {1} indexed".format(len(self.results),
+                                                                                 len(search_index)))
+
+    def on_activate(self, e):
+        render_entry = self.results[e.GetIndex()]
+        if not self.parent.show_search_result(render_entry):
+            # The page has been closed since the search was made
+            self.on_search(None)
+
+    def on_close(self, e):
+        self.parent.search_dialog = None
+        self.Destroy()
+
 
 class HelpDialog(wx.Dialog):
 
@@ -508,8 +2920,10 @@ class MainWindow(wx.Frame):
         self.help_menu = wx.Menu()
 
         self.help_menu.Append(QUICK_HELP, "&Quick Start Guide")
+        self.help_menu.Append(DIAGNOSTICS, "&Diagnostics")
         self.help_menu.AppendSeparator()
         self.help_menu.Append(ABOUT_BOX, "&About")
+        self.Bind(wx.EVT_MENU, self.on_diagnostics, id=DIAGNOSTICS)
         self.Bind(wx.EVT_MENU, self.on_about_box, id=ABOUT_BOX)
         self.Bind(wx.EVT_MENU, self.on_help_box, id=QUICK_HELP)
 
@@ -538,10 +2952,22 @@ class MainWindow(wx.Frame):
 
         self.results_notebook = ResultsNotebook(self)
         self.page_counter = 0
+        self.search_dialog = None
 
         self.statusbar = self.CreateStatusBar()
+        self.statusbar.SetFieldsCount(3)
+        self.statusbar.SetStatusWidths([-1, 160, 220])
         self.statusbar.SetStatusText("Ready...")
 
+        self.status_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.update_status_info, self.status_timer)
+        self.status_timer.Start(status_refresh_ms)
+        self.update_status_info(None)
+
+        serial_index.start_refresh(serial_index_refresh_s)
+
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+
         self.SetSize((600, 500))
         self.SetTitle("BCA Tracker 3 Beacon Tracker")
 
@@ -555,7 +2981,7 @@ class MainWindow(wx.Frame):
         else:
             self.statusbar.Hide()
             log_str = "Hide"
-        logger.info("MainWindow:toggle_status_bar: {0}".format(log_str))
+        logger.info("MainWindow:toggle_status_bar: %s", log_str)
 
     def toggle_tool_bar(self, e):
         if self.view_menu.shtl.IsChecked():
@@ -564,16 +2990,91 @@ class MainWindow(wx.Frame):
         else:
             self.toolbar.Hide()
             log_str = "Hide"
-        logger.info("MainWindow:toggle_tool_bar: {0}".format(log_str))
+        logger.info("MainWindow:toggle_tool_bar: %s", log_str)
+
+    def set_tab_limit(self, e):
+        """
+            This function asks for the number of result tabs to keep in memory
+        """
+        limit = wx.GetNumberFromUser("Tabs beyond this limit are unloaded and rebuilt when selected.",
+                                     "Open tabs:", "Open Tab Limit", self.results_notebook.max_live_pages,
+                                     1, 500, self)
+        if limit > 0:
+            logger.info("MainWindow:set_tab_limit: %s", limit)
+            self.results_notebook.set_max_live_pages(limit)
+            self.update_status_info(None)
+
+    def toggle_local_mirror(self, e):
+        """
+            This function enables or disables the local mirror. Lookups are only
+            answered from the mirror once its first sync has completed.
+        """
+        global local_mirror
+
+        if self.view_menu.use_mirror.IsChecked():
+            if local_mirror is None:
+                local_mirror = LocalMirror(mirror_db_path)
+            local_mirror.start_sync(mirror_sync_interval_s)
+            log_str = "Enable"
+        else:
+            if local_mirror is not None:
+                local_mirror.close()
+            local_mirror = None
+            log_str = "Disable"
+        logger.info("MainWindow:toggle_local_mirror: %s", log_str)
+
+        self.update_status_info(None)
+
+    def toggle_prefetch(self, e):
+        """
+            This function enables or disables prefetching of the serial numbers
+            following each lookup
+        """
+        enabled = self.view_menu.prefetch.IsChecked()
+        logger.info("MainWindow:toggle_prefetch: %s", "Enable" if enabled else "Disable")
+        prefetcher.set_enabled(enabled)
+
+    def set_log_level(self, e):
+        """
+            This function sets the log level selected in the View menu
+        """
+        for menu_id, label, level in log_level_menu_ids:
+            if menu_id == e.GetId():
+                logger.setLevel(level)
+                logger.warning("MainWindow:set_log_level: %s", label)
+
+    def update_status_info(self, e):
+        """
+            This function displays the number of live result tabs and the
+            memory used by the application in the status bar
+        """
+        status_str = "Tabs: {0}/{1}".format(self.results_notebook.live_page_count(),
+                                            self.results_notebook.max_live_pages)
+
+        mem_bytes = get_process_memory()
+        if mem_bytes is not None:
+            status_str += ", Mem: {0:.1f} MB".format(mem_bytes / (1024.0 * 1024.0))
+
+        self.statusbar.SetStatusText(status_str, 2)
+
+        if local_mirror is None:
+            mirror_str = ""
+        elif local_mirror.is_ready():
+            mirror_str = "Mirror: {0}".format(format_age(local_mirror.last_sync_time()))
+            if local_mirror.sync_error is not None:
+                mirror_str += " (sync failed)"
+        else:
+            mirror_str = "Mirror: syncing..."
+        self.statusbar.SetStatusText(mirror_str, 1)
 
     def new_query(self, e):
         """
             This function displays a SerialNumberDialog window. After a serial
-            number has been input, a query is then run on the T3Production
-            database and the relevant information for the specified beacon is
-            returned.
+            number has been input, a results page is opened for the beacon and
+            the T3Production database is queried in the background, with each
+            table being added to the page as it is returned.
         :param e: Event ID
-        :return: List of dictionaries containing manufacturing information for the specified beacon.
+        :return:
         """
         logger.debug("MainWindow:new_query")
         self.statusbar.SetStatusText('Waiting for Serial Number input...')
@@ -584,38 +3085,183 @@ class MainWindow(wx.Frame):
         try:
             ser_num = ser_num_diag.serial_number
 
-            logger.info("MainWindow:new_query: get beacon info for sn# {0}".format(ser_num))
-            self.statusbar.SetStatusText("Retrieving information for SN# {0}".format(ser_num))
-            self.add_new_results_page(ser_num, get_beacon_info(ser_num))
+            logger.info("MainWindow:new_query: get beacon info for sn# %s", ser_num)
+            self.add_new_results_page(ser_num)
+            prefetcher.on_lookup(ser_num)
 
         except AttributeError:
             logger.info("MainWindow:new_query: no serial number was input")
+            self.statusbar.SetStatusText("Ready...")
 
         ser_num_diag.Destroy()
-        self.statusbar.SetStatusText("Ready...")
 
-    def add_new_results_page(self, serial_number, beacon_info):
+    def add_new_results_page(self, serial_number, beacon_info=None, node_labels=None, page_text=None,
+                             render_entries=None):
+        """
+            This function adds a results page for the specified beacon to the
+            results notebook. If beacon_info is None the page is displayed
+            straight away and the data is retrieved from T3Production in a
+            background thread.
+        :param serial_number: Serial number of the beacon
+        :param beacon_info: List of records for the beacon, or None to query the database
+        :param node_labels: Sub-assembly labels for genealogy results, see ResultsPage
+        :param page_text: Tab text, defaults to the serial number
+        :param render_entries: Render model for beacon_info, built on the UI thread if None
+        :return: The new ResultsPage
+        """
+        logger.debug("MainWindow:add_new_results")
+
+        results_page = ResultsPage(self.results_notebook, beacon_info, serial_number, node_labels, render_entries)
+        self.add_notebook_page(results_page, page_text or serial_number)
+        search_index.add_entries(results_page.render_entries)
+
+        if beacon_info is None:
+            self.statusbar.SetStatusText("Retrieving information for SN# {0}".format(serial_number))
+            fetch_beacon_tables_async(serial_number,
+                                      lambda result, entries: self.on_table_result(results_page, result, entries),
+                                      lambda error_str: self.on_results_done(results_page, error_str))
+        else:
+            self.statusbar.SetStatusText("Done...")
+
+        return results_page
+
+    def add_notebook_page(self, page, page_text):
+        """
+            This function adds a page to the results notebook and selects it,
+            replacing the empty page if no pages have been added yet.
+        """
+        if self.page_counter is 0:
+            logger.debug("MainWindow:add_notebook_page: -> first page entry")
+            self.results_notebook.DeletePage(0)
+            self.results_notebook.AddPage(page, page_text)
+        else:
+            logger.debug("MainWindow:add_notebook_page: -> add new page entry")
+            self.results_notebook.AddPage(page, page_text)
+
+        index = self.results_notebook.GetPageCount() - 1
+        self.results_notebook.SetSelection(index)
+        self.results_notebook.touch_page(page)
+        self.page_counter += 1
+
+    def genealogy_query(self, e):
+        """
+            This function asks for a serial number and displays the merged
+            history of the unit and all of its sub-assembly boards.
+        """
+        logger.debug("MainWindow:genealogy_query")
+        self.statusbar.SetStatusText('Waiting for Serial Number input...')
+
+        ser_num_diag = SerialNumberDialog(self)
+        ser_num_diag.ShowModal()
+
+        try:
+            ser_num = ser_num_diag.serial_number
+        except AttributeError:
+            logger.info("MainWindow:genealogy_query: no serial number was input")
+            self.statusbar.SetStatusText("Ready...")
+            ser_num_diag.Destroy()
+            return
+
+        ser_num_diag.Destroy()
+
+        self.statusbar.SetStatusText("Retrieving genealogy for SN# {0}".format(ser_num))
+        def build_genealogy():
+            records, node_labels = get_beacon_genealogy(ser_num)
+            return records, node_labels, build_render_entries(records, ser_num, node_labels)
+
+        run_async(build_genealogy,
+                  lambda result, error_str: self.on_genealogy_done(ser_num, result, error_str),
+                  "genealogy-{0}".format(ser_num))
+
+    def on_genealogy_done(self, serial_number, genealogy, error_str):
+        if error_str is not None:
+            self.statusbar.SetStatusText(error_str)
+            return
+
+        records, node_labels, render_entries = genealogy
+        self.add_new_results_page(serial_number, records, node_labels, "{0} (genealogy)".format(serial_number),
+                                  render_entries)
+
+    def show_production_monitor(self, e):
+        """
+            This function selects the production monitor tab, opening it and
+            starting the monitor if it is not already open.
+        """
+        for index in range(self.results_notebook.GetPageCount()):
+            if isinstance(self.results_notebook.GetPage(index), MonitorPage):
+                self.results_notebook.SetSelection(index)
+                return
+
+        logger.info("MainWindow:show_production_monitor: starting monitor")
+        monitor = ProductionMonitor(monitor_window_hours, monitor_max_events)
+        monitor.start()
+        self.add_notebook_page(MonitorPage(self.results_notebook, monitor), "Production Monitor")
+
+    def df_analysis(self, e):
+        """
+            This function asks for a list of serial numbers, retrieves their
+            DFTestingTable entries in the background and displays the DF value
+            statistics for the batch in a new tab.
+        """
+        logger.debug("MainWindow:df_analysis")
+
+        if numpy is None:
+            no_numpy = wx.MessageDialog(None, "NumPy is required for DF analysis", "Error: DF Lot Analysis",
+                                        wx.OK | wx.ICON_ERROR)
+            no_numpy.ShowModal()
+            return
+
+        sn_list_diag = SerialListDialog(self, "DF Lot Analysis")
+        if sn_list_diag.ShowModal() != wx.ID_OK or len(sn_list_diag.serial_numbers) is 0:
+            logger.debug("MainWindow:df_analysis: user canceled action")
+            sn_list_diag.Destroy()
+            return
+
+        serial_numbers = sn_list_diag.serial_numbers
+        sn_list_diag.Destroy()
+
+        self.statusbar.SetStatusText("Retrieving DF data for {0} serial numbers".format(len(serial_numbers)))
+        run_async(lambda: analyze_df_values(get_df_batch_info(serial_numbers)), self.on_df_analysis_done,
+                  "df-analysis")
+
+    def on_df_analysis_done(self, analysis, error_str):
+        if error_str is not None:
+            self.statusbar.SetStatusText(error_str)
+            return
+
+        self.add_notebook_page(DfAnalysisPage(self.results_notebook, analysis), "DF Analysis")
+        self.statusbar.SetStatusText("Done...")
+
+    def on_table_result(self, results_page, table_result, render_entries):
+        """
+            Called on the UI thread when a DB table has been retrieved for a
+            results page
+        """
+        # The page may have been closed while the query was running
+        if not results_page:
+            return
+
+        self.statusbar.SetStatusText("Retrieved {0} for SN# {1}".format(format_db_table_str(table_result.db_table),
+                                                                        results_page.serial_number))
+        results_page.add_table_result(table_result, render_entries)
+        search_index.add_entries(render_entries)
+        if self.search_dialog is not None:
+            self.search_dialog.on_search(None)
+
+    def on_results_done(self, results_page, error_str):
         """
-            This function adds the results of a get_beacon_info() call to a page
-            of the results notebook.
-        :return:
+            Called on the UI thread when all of the DB tables have been
+            retrieved for a results page, or the retrieval failed
         """
-        logger.debug("MainWindow:add_new_results")
-        self.statusbar.SetStatusText("Retrieving data from T3Production")
-
-        if self.page_counter is 0:
-            logger.debug("MainWindow:add_new_results: -> first page entry")
-            self.results_notebook.DeletePage(0)
-            self.results_notebook.AddPage(ResultsPage(self.results_notebook, beacon_info, serial_number), serial_number)
-        else:
-            logger.debug("MainWindow:add_new_results: -> add new page entry")
-            self.results_notebook.AddPage(ResultsPage(self.results_notebook, beacon_info, serial_number), serial_number)
+        if not results_page:
+            return
 
-        index = self.results_notebook.GetPageCount() - 1
-        self.results_notebook.SetSelection(index)
-        self.page_counter += 1
+        results_page.finish_loading(error_str)
 
-        self.statusbar.SetStatusText("Done...")
+        if error_str is None:
+            self.statusbar.SetStatusText("Done...")
+        else:
+            self.statusbar.SetStatusText(error_str)
 
     def save_results(self, e):
         """
@@ -624,8 +3270,33 @@ class MainWindow(wx.Frame):
         :param e:
         :return:
         """
+        page_to_save = self.results_notebook.GetPage(self.results_notebook.GetSelection())
+        if isinstance(page_to_save, DfAnalysisPage):
+            page_to_save.on_export(e)
+            return
+        if isinstance(page_to_save, MonitorPage):
+            no_report = wx.MessageDialog(None, "The production monitor cannot be saved, open a report to save it",
+                                         "Error: No report open", wx.OK | wx.ICON_ERROR)
+            no_report.ShowModal()
+            return
+
         ser_num_to_save = self.results_notebook.GetPageText(self.results_notebook.GetSelection())
-        logger.debug("MainWindow:save_results: save notebook page {0}".format(ser_num_to_save))
+        logger.debug("MainWindow:save_results: save notebook page %s", ser_num_to_save)
+
+        # Save the displayed records rather than querying them again on the UI thread
+        if getattr(page_to_save, "loading", False):
+            still_loading = wx.MessageDialog(None, "SN# {0} is still being retrieved, save it once it has "
+                                                   "loaded".format(page_to_save.serial_number),
+                                             "Error: Report loading", wx.OK | wx.ICON_ERROR)
+            still_loading.ShowModal()
+            return
+
+        data_to_save = None
+        render_entries = None
+        if isinstance(page_to_save, (ResultsPage, ResultsPlaceholder)):
+            ser_num_to_save = page_to_save.serial_number
+            data_to_save = page_to_save.beacon_data
+            render_entries = page_to_save.render_entries
 
         if ser_num_to_save == "< ... >":
             no_report = wx.MessageDialog(None, "No report open, cannot save empty file", "Error: No report open",
@@ -633,17 +3304,110 @@ class MainWindow(wx.Frame):
             no_report.ShowModal()
             return
 
-        save_diag = wx.FileDialog(self, "Save {0} file", "", "", "JSON files (*.json)|*.json", wx.FD_SAVE |
-                                  wx.FD_OVERWRITE_PROMPT)
+        save_diag = wx.FileDialog(self, "Save {0} file", "", "", "JSON files (*.json)|*.json|Text reports (*.txt)|"
+                                                                 "*.txt", wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
 
         if save_diag.ShowModal() == wx.ID_CANCEL:
             logger.debug("MainWindow:save_results: user canceled action")
             return
         else:
-            logger.debug("MainWindow:save_results: path={0}".format(save_diag.GetPath()))
+            logger.debug("MainWindow:save_results: path=%s", save_diag.GetPath())
+
+            if save_diag.GetFilterIndex() == 1:
+                save_text_report(save_diag.GetPath(), ser_num_to_save, render_entries)
+            else:
+                # Format and save file as JSON
+                save_json_file(save_diag.GetPath(), ser_num_to_save, data_to_save)
+
+    def export_lot(self, e):
+        """
+            This function asks for a list of serial numbers and a file name and
+            exports the beacons to a columnar export file in the background.
+        """
+        logger.debug("MainWindow:export_lot")
+
+        sn_list_diag = SerialListDialog(self, "Export Lot")
+        if sn_list_diag.ShowModal() != wx.ID_OK or len(sn_list_diag.serial_numbers) is 0:
+            logger.debug("MainWindow:export_lot: user canceled action")
+            sn_list_diag.Destroy()
+            return
+
+        serial_numbers = sn_list_diag.serial_numbers
+        sn_list_diag.Destroy()
+
+        save_diag = wx.FileDialog(self, "Export Lot", "", "", "Columnar exports (*.bcol)|*.bcol",
+                                  wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if save_diag.ShowModal() == wx.ID_CANCEL:
+            logger.debug("MainWindow:export_lot: user canceled action")
+            return
+
+        file_path = save_diag.GetPath()
+        self.statusbar.SetStatusText("Exporting {0} serial numbers".format(len(serial_numbers)))
+        run_async(lambda: export_lot_columnar(file_path, serial_numbers),
+                  lambda row_count, error_str: self.on_export_lot_done(file_path, row_count, error_str),
+                  "lot-export")
+
+    def on_export_lot_done(self, file_path, row_count, error_str):
+        if error_str is not None:
+            self.statusbar.SetStatusText("Export failed: {0}".format(error_str))
+            export_err = wx.MessageDialog(None, "Unable to export lot to {0}\n\n{1}".format(file_path, error_str),
+                                          "Error: Export Lot", wx.OK | wx.ICON_ERROR)
+            export_err.ShowModal()
+            return
+
+        self.statusbar.SetStatusText("Exported {0} rows to {1}".format(row_count, file_path))
+
+    def open_columnar_file(self, file_path):
+        """
+            This function asks which beacon to open from a columnar export file
+            and adds a tab for it. Only the row groups holding the beacon are
+            read.
+        """
+        try:
+            reader = ColumnarFileReader(file_path)
+        except (IOError, ValueError, zlib.error) as err:
+            logger.error("MainWindow:open_columnar_file: Unable to open file: %s", err)
+            open_file_err = wx.MessageDialog(None, "Unable to open columnar export file", "Error: Open Report File",
+                                             wx.OK | wx.ICON_ERROR)
+            open_file_err.ShowModal()
+            return
+
+        serial_numbers = reader.serial_numbers()
+        if len(serial_numbers) is 0:
+            return
+        elif len(serial_numbers) is 1:
+            serial_number = serial_numbers[0]
+        else:
+            sn_diag = wx.SingleChoiceDialog(self, "Select the beacon to open", "Open Columnar Export",
+                                            serial_numbers)
+            if sn_diag.ShowModal() != wx.ID_OK:
+                sn_diag.Destroy()
+                return
+            serial_number = sn_diag.GetStringSelection()
+            sn_diag.Destroy()
+
+        def load_beacon():
+            data = reader.read_beacon(serial_number)
+            return data, build_render_entries(data, serial_number)
+
+        run_async(load_beacon, lambda result, error_str: self.on_file_loaded(serial_number, result, error_str),
+                  "open-file")
+
+    def on_file_loaded(self, serial_number, result, error_str):
+        """
+            Called on the UI thread once a report file has been read and its
+            page model built
+        :param result: (records, render_entries)
+        """
+        if error_str is not None:
+            logger.error("MainWindow:on_file_loaded: Unable to open file: %s", error_str)
+            open_file_err = wx.MessageDialog(None, "Unable to open report file\n\n{0}".format(error_str),
+                                             "Error: Open Report File", wx.OK | wx.ICON_ERROR)
+            open_file_err.ShowModal()
+            return
 
-            # Format and save file as JSON
-            save_json_file(save_diag.GetPath(), ser_num_to_save)
+        data, render_entries = result
+        self.add_new_results_page(serial_number, data, render_entries=render_entries)
 
     def open_file(self, e):
         """
@@ -654,13 +3418,16 @@ class MainWindow(wx.Frame):
         """
         logger.debug("MainWindow:open_file")
 
-        open_diag = wx.FileDialog(self, "Open JSON Report File", "", "", "JSON files (*.json)|*.json",
-                                  wx.FD_OPEN | wx.FD_FILE_MUST_EXIST)
+        open_diag = wx.FileDialog(self, "Open JSON Report File", "", "", "JSON files (*.json)|*.json|"
+                                  "Columnar exports (*.bcol)|*.bcol", wx.FD_OPEN | wx.FD_FILE_MUST_EXIST)
         if open_diag.ShowModal() == wx.ID_CANCEL:
             logger.debug("MainWindow:open_file: user canceled action")
             return
+        elif open_diag.GetPath().lower().endswith(".bcol"):
+            logger.debug("Mainwindow:open_file: columnar path=%s", open_diag.GetPath())
+            self.open_columnar_file(open_diag.GetPath())
         else:
-            logger.debug("Mainwindow:open_file: path={0}".format(open_diag.GetPath()))
+            logger.debug("Mainwindow:open_file: path=%s", open_diag.GetPath())
 
             with open(open_diag.GetPath(), "r") as f:
                 try:
@@ -676,13 +3443,52 @@ class MainWindow(wx.Frame):
                     else:
                         serial_number_text = "serialNumber"
 
-                    self.add_new_results_page(data[0][serial_number_text], data)
+                    serial_number = data[0][serial_number_text]
+
+                    # Build the page model in the background, as it may look up employee names
+                    run_async(lambda: (data, build_render_entries(data, serial_number)),
+                              lambda result, error_str: self.on_file_loaded(serial_number, result, error_str),
+                              "open-file")
                 except IndexError:
                     logger.error("MainWindow:open_file: Unable to open file")
                     open_file_err = wx.MessageDialog(None, "Unable to open report file", "Error: Open Report File",
                                                      wx.OK | wx.ICON_ERROR)
                     open_file_err.ShowModal()
 
+    def on_search(self, e):
+        """
+            This function shows the SearchDialog for the records of the open
+            results pages
+        """
+        logger.debug("MainWindow:on_search")
+        if self.search_dialog is None:
+            self.search_dialog = SearchDialog(self)
+        self.search_dialog.Show()
+        self.search_dialog.Raise()
+
+    def show_search_result(self, render_entry):
+        """
+            This function selects the tab and tree item of a search result,
+            rebuilding the page first if it has been evicted.
+        :param render_entry: RenderEntry returned by search_index.search()
+        :return: False if the page has been closed
+        """
+        for index in range(self.results_notebook.GetPageCount()):
+            page = self.results_notebook.GetPage(index)
+            if not isinstance(page, (ResultsPage, ResultsPlaceholder)):
+                continue
+            if not any(page_entry is render_entry for page_entry in page.render_entries):
+                continue
+
+            self.results_notebook.SetSelection(index)
+            page = self.results_notebook.touch_page(self.results_notebook.GetPage(index))
+            return page.select_render_entry(render_entry)
+
+        logger.info("MainWindow:show_search_result: page has been closed")
+        search_index.remove_entries([render_entry])
+
+        return False
+
     def on_about_box(self, e):
         logger.debug("MainWindow:on_about_box")
 
@@ -731,6 +3537,50 @@ class MainWindow(wx.Frame):
         help.ShowModal()
         help.Destroy()
 
+    def on_diagnostics(self, e):
+        """
+            This function displays the diagnostics dialog
+        """
+        diagnostics = DiagnosticsDialog(self)
+
+        diagnostics.ShowModal()
+        diagnostics.Destroy()
+
+    def get_diagnostics(self):
+        """
+            This function returns the values displayed in the diagnostics dialog
+        :return: List of (name, value) string tuples
+        """
+        breaker = db_access.breaker
+        diagnostics = [("Circuit breaker", breaker.state),
+                       ("Consecutive failures", str(breaker.consecutive_failures))]
+        for name in ("calls", "retries", "failures", "fast_fails", "stale_served"):
+            diagnostics.append(("DB " + name.replace("_", " "), str(db_access.stats[name])))
+        diagnostics.append(("Cached beacons", str(len(result_cache))))
+        diagnostics.append(("Indexed serial numbers", "{0} ({1:.1f} MB)".format(
+            len(serial_index), serial_index.serials.size_bytes() / (1024.0 * 1024.0))))
+
+        if prefetcher.enabled or prefetcher.stats["fetched"] is not 0:
+            stats = dict(prefetcher.stats)
+            diagnostics.append(("Prefetch hits", "{0}/{1} lookups ({2:.0%})".format(
+                stats["hits"], stats["lookups"], stats["hits"] / float(max(stats["lookups"], 1)))))
+            diagnostics.append(("Prefetch queries", str(stats["fetched"])))
+            diagnostics.append(("Prefetch wasted", "{0} fetched, {1} cancelled before fetching".format(
+                stats["wasted"], stats["cancelled"])))
+        diagnostics.append(("Search index records", str(len(search_index))))
+        diagnostics.append(("Live tabs", "{0}/{1}".format(self.results_notebook.live_page_count(),
+                                                          self.results_notebook.max_live_pages)))
+        mem_bytes = get_process_memory()
+        if mem_bytes is not None:
+            diagnostics.append(("Memory", "{0:.1f} MB".format(mem_bytes / (1024.0 * 1024.0))))
+
+        if local_mirror is not None:
+            last_sync = local_mirror.last_sync_time()
+            diagnostics.append(("Mirror last sync", "never" if last_sync is None else str(last_sync)))
+            diagnostics.append(("Mirror sync error", local_mirror.sync_error or "none"))
+
+        return diagnostics
+
     def on_quit(self, e):
         """
             This function closes and exits the application
@@ -738,6 +3588,20 @@ class MainWindow(wx.Frame):
         logger.info("MainWindow:on_quit")
         self.Close()
 
+    def on_close(self, e):
+        """
+            This function stops the background threads when the main window is
+            closed, from the menu or the title bar. The log listener is stopped
+            by main() once the window has been destroyed.
+        """
+        logger.info("MainWindow:on_close")
+        self.status_timer.Stop()
+        serial_index.stop_refresh()
+        prefetcher.stop()
+        if local_mirror is not None:
+            local_mirror.stop_sync()
+        e.Skip()
+
 
 # -----------------------------------------------------------------------------
 # FUNCTIONS
@@ -779,7 +3643,7 @@ def format_column_str(str_to_format):
     :param str_to_format: database table key string to format
     :return: formatted_string: formatted string
     """
-    logger.debug("format_column_str: format {0} str".format(str_to_format))
+    logger.debug("format_column_str: format %s str", str_to_format)
 
     if str_to_format == "employeeID":
         formatted_str = "Employee"
@@ -812,11 +3676,53 @@ def format_column_str(str_to_format):
     else:
         formatted_str = str_to_format
 
-    logger.debug("format_column_str: formatted str={0}".format(formatted_str))
+    logger.debug("format_column_str: formatted str=%s", formatted_str)
 
     return formatted_str
 
 
+def connect_db():
+    """
+        This function opens a connection to T3Production with the login and
+        query timeouts set
+    :return: pyodbc connection
+    """
+    logger.debug("connect_db: Connecting to T3Production database")
+    cnxn = pyodbc.connect(sql_cnxn_str, timeout=db_login_timeout_s)
+    cnxn.timeout = db_query_timeout_s
+
+    return cnxn
+
+
+def is_transient_db_error(err):
+    """
+        This function returns True if the ODBC error is likely to succeed when
+        retried
+    :param err: pyodbc.Error
+    :return: bool
+    """
+    if isinstance(err, pyodbc.OperationalError):
+        return True
+
+    return len(err.args) > 0 and err.args[0] in transient_sqlstates
+
+
+def fetch_one(sql_query):
+    """
+        This function runs a query on a new connection and returns the first
+        row
+    :param sql_query: SQL query to run
+    :return: pyodbc Row or None
+    """
+    cnxn = connect_db()
+    try:
+        cursor = cnxn.cursor()
+        cursor.execute(sql_query)
+        return cursor.fetchone()
+    finally:
+        close_db(cnxn)
+
+
 def get_employee_name(employee_id):
     """
         This function returns a string containing the Employee Name for the ID
@@ -824,22 +3730,39 @@ def get_employee_name(employee_id):
     :param employee_id: Employee ID to return name of
     :return: workstation_str: String containing the Employees name
     """
+    try:
+        return employee_name_cache[employee_id]
+    except KeyError:
+        pass
 
-    logger.debug("format_workstation_str: Connecting to T3Production database")
-    cnxn = pyodbc.connect(sql_cnxn_str)
-    cursor = cnxn.cursor()
+    if local_mirror is not None:
+        employee_name = local_mirror.lookup_value("employeeTable", "employeeID", employee_id, "employeeName")
+        if employee_name is not None:
+            employee_name_cache[employee_id] = str(employee_name)
+            return employee_name_cache[employee_id]
 
     sql_query = "SELECT * FROM employeeTable WHERE employeeID='{0}'".format(str(employee_id))
+    logger.debug("get_employee_name: SQL query=%s", sql_query)
+
+    try:
+        db_info = db_access.call(lambda: fetch_one(sql_query))
+    except pyodbc.Error as err:
+        # Display the ID rather than holding up the results page
+        logger.error("get_employee_name: unable to retrieve employee %s: %s", employee_id, err)
+        return str(employee_id)
 
-    logger.debug("get_employee_name: SQL query={0}".format(sql_query))
-    cursor.execute(sql_query)
-    db_info = cursor.fetchone()
+    logger.debug("get_employee_name: db_info=%s", db_info)
 
-    logger.debug("get_employee_name: db_info={0}".format(db_info))
+    if db_info is None:
+        # Unknown IDs are not cached so a newly added employee is picked up
+        logger.warning("get_employee_name: employee %s not found", employee_id)
+        return str(employee_id)
 
-    logger.debug("get_employee_name: employee_name_str={0}".format(db_info.employeeName))
+    logger.debug("get_employee_name: employee_name_str=%s", db_info.employeeName)
 
-    return str(db_info.employeeName)
+    employee_name_cache[employee_id] = str(db_info.employeeName)
+
+    return employee_name_cache[employee_id]
 
 
 def get_failure_description(failure_code):
@@ -849,143 +3772,917 @@ def get_failure_description(failure_code):
     :param failure_code: Code to find failure description of
     :return: failure_str: Description of the failure
     """
-
-    logger.debug("format_workstation_str: Connecting to T3Production database")
-    cnxn = pyodbc.connect(sql_cnxn_str)
-    cursor = cnxn.cursor()
+    try:
+        return failure_description_cache[failure_code]
+    except KeyError:
+        pass
+
+    if local_mirror is not None:
+        failure_str = local_mirror.lookup_value("failureModeTable", "failureCode", failure_code,
+                                                "failureDescription")
+        if failure_str is not None:
+            failure_description_cache[failure_code] = str(failure_str)
+            return failure_description_cache[failure_code]
 
     sql_query = "SELECT * FROM failureModeTable WHERE failureCode='{0}'".format(str(failure_code))
+    logger.debug("get_failure_description: SQL query=%s", sql_query)
+
+    try:
+        db_info = db_access.call(lambda: fetch_one(sql_query))
+    except pyodbc.Error as err:
+        logger.error("get_failure_description: unable to retrieve failure code %s: %s", failure_code, err)
+        return "Unknown"
+
+    logger.debug("get_failure_description: db_info=%s", db_info)
+
+    if db_info is None:
+        logger.warning("get_failure_description: failure code %s not found", failure_code)
+        return "Unknown"
+
+    logger.debug("get_failure_description: failure_str=%s", db_info.failureDescription)
+
+    failure_description_cache[failure_code] = str(db_info.failureDescription)
+
+    return failure_description_cache[failure_code]
+
+
+def get_record_class(db_table, db_cursor):
+    """
+        This function returns the compact record class for the specified
+        database table. The column names are taken from the description of the
+        last query executed on db_cursor and cached, so the class is only
+        generated the first time a table is queried.
+    :param db_table: Table the record class is for
+    :param db_cursor: Cursor which has just executed a SELECT on db_table
+    :return: BeaconRecord subclass for the table
+    """
+    try:
+        return db_record_classes[db_table]
+    except KeyError:
+        pass
+
+    logger.info("get_record_class: retrieving %s column names", db_table)
+    db_col_names = tuple(column[0] for column in db_cursor.description)
+    logger.debug("get_record_class: -> DB Table Columns=%s", db_col_names)
+
+    record_class = type(str(db_table) + "Record", (BeaconRecord,), {"__slots__": db_col_names,
+                                                                    "db_table": db_table,
+                                                                    "fields": db_col_names,
+                                                                    "field_set": frozenset(db_col_names)})
+
+    db_record_classes[db_table] = record_class
+
+    return record_class
 
-    logger.debug("get_failure_description: SQL query={0}".format(sql_query))
-    cursor.execute(sql_query)
-    db_info = cursor.fetchone()
 
-    logger.debug("get_failure_description: db_info={0}".format(db_info))
+def get_table_watermark(db_table, db_cursor):
+    """
+        This function returns the (transactionTime, transactionID) of the last
+        row in a DB table
+    :param db_table: Table to check
+    :param db_cursor: Cursor for the database connection
+    :return: (transactionTime, transactionID), or None if the table is empty
+    """
+    db_cursor.execute("SELECT MAX(transactionTime) FROM {0}".format(db_table))
+    last_time = db_cursor.fetchone()[0]
+    if last_time is None:
+        return None
+
+    db_cursor.execute("SELECT MAX(transactionID) FROM {0} WHERE transactionTime = ?".format(db_table), last_time)
 
-    logger.debug("get_failure_description: failure_str={0}".format(db_info.failureDescription))
+    return last_time, db_cursor.fetchone()[0]
 
-    return str(db_info.failureDescription)
+
+def get_process_memory():
+    """
+        This function returns the amount of memory used by the application
+    :return: Working set size in bytes, or None if it cannot be determined
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD),
+                        ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t),
+                        ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t),
+                        ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+def get_serial_number_column(db_table):
+    """
+        This function returns the name of the top-level serial number column,
+        this is due to a different string being used in the
+        assemblyKittingTable and falloutTable DB Tables
+    :param db_table: DB table name
+    :return: Serial number column name
+    """
+    if db_table == "assemblyKittingTable" or db_table == "falloutTable":
+        return "serialNumberUnit"
+    else:
+        return "serialNumber"
 
 
 def get_db_table_info(db_table, serial_number, db_cursor):
     """
-        This function returns an array containing dictionaries containing table
-        entries for the specified database table and unit serial number
+        This function returns a list of records containing table entries for the
+        specified database table and unit serial number, ordered by
+        transactionTime
     :param db_table: Table to search
     :param serial_number: Serial number to search for
     :param db_cursor: Cursor for the database connection
-    :return: List of dictionaries containing all of the database fields
+    :return: List of records containing all of the database fields
     """
-    logger.info("get_db_table_info: retrieving DB Table {0} info for serialNumber {1}".format(db_table, serial_number))
+    logger.info("get_db_table_info: retrieving DB Table %s info for serialNumber %s", db_table, serial_number)
 
-    # Set serial_number_text string, this is due to a different string being used
-    # in the assemblyKittingTable and falloutTable DB Tables
-    if db_table is "assemblyKittingTable" or db_table is "falloutTable":
-        serial_number_text = "serialNumberUnit"
-    else:
-        serial_number_text = "serialNumber"
+    serial_number_text = get_serial_number_column(db_table)
 
-    sql_query = "SELECT * FROM {0} WHERE {1}='{2}'".format(db_table, serial_number_text, serial_number)
-    logger.debug("get_db_table_info: -> execute SQL Query={0}".format(sql_query))
+    sql_query = "SELECT * FROM {0} WHERE {1}='{2}' ORDER BY transactionTime".format(db_table, serial_number_text,
+                                                                                  serial_number)
+    logger.debug("get_db_table_info: -> execute SQL Query=%s", sql_query)
     db_cursor.execute(sql_query)
 
     # Retrieve all returned rows
-    db_entries = []
-    while 1:
-        row = db_cursor.fetchone()
-        if not row:
-            break
-        db_entries.append(row)
-        logger.debug("get_db_table_info: -> DB Table Row={0}".format(row))
+    db_entries = db_cursor.fetchall()
+    logger.debug("get_db_table_info: -> %s DB Table Rows", len(db_entries))
+
+    record_class = get_record_class(db_table, db_cursor)
+
+    # Generate records for the retrieved DB table entries
+    logger.info("get_db_table_info: building %s entry record list", db_table)
+    return [record_class(entry) for entry in db_entries]
+
+
+def get_db_table_info_batch(db_table, serial_numbers, db_cursor, columnar=False):
+    """
+        This function returns the table entries for all of the specified serial
+        numbers. The serial numbers are queried in batches of batch_query_size
+        using a single IN query per batch.
+    :param db_table: Table to search
+    :param serial_numbers: List of serial numbers to search for
+    :param db_cursor: Cursor for the database connection
+    :param columnar: Return the rows as a ColumnarTable instead of a list
+    :return: List of records, or a ColumnarTable, ordered by transactionTime within each batch
+    """
+    logger.info("get_db_table_info_batch: retrieving DB Table %s info for %s serial numbers", db_table,
+                len(serial_numbers))
+
+    serial_number_text = get_serial_number_column(db_table)
+    serial_numbers = list(serial_numbers)
+
+    db_entries = None
+    for start in range(0, max(len(serial_numbers), 1), batch_query_size):
+        batch = serial_numbers[start:start + batch_query_size]
+        if len(batch) is 0:
+            sql_query = "SELECT * FROM {0} WHERE 1=0".format(db_table)
+        else:
+            sql_query = "SELECT * FROM {0} WHERE {1} IN ({2}) ORDER BY transactionTime".format(
+                db_table, serial_number_text, ",".join("?" * len(batch)))
+
+        logger.debug("get_db_table_info_batch: -> execute SQL Query=%s", sql_query)
+        db_cursor.execute(sql_query, *batch)
+        rows = db_cursor.fetchall()
+
+        if db_entries is None:
+            record_class = get_record_class(db_table, db_cursor)
+            db_entries = ColumnarTable(record_class) if columnar else []
+
+        if columnar:
+            db_entries.extend(rows)
+        else:
+            db_entries.extend(record_class(row) for row in rows)
+
+    return db_entries
+
+
+def query_beacon_tables(serial_number):
+    """
+        This function yields the TableResult of each manufacturing table for
+        the specified beacon. The results are read from the local mirror when
+        it is enabled and has been synced, otherwise T3Production is queried.
+    :param serial_number: Serial number of beacon to retrieve data for
+    :return: Generator of TableResult tuples, one per entry in db_table_list
+    """
+    mirror = local_mirror
+    if mirror is not None and mirror.is_ready():
+        logger.info("query_beacon_tables: Reading %s from local mirror", serial_number)
+        for table in db_table_list:
+            yield mirror.get_table_result(table, serial_number)
+        return
+
+    prefetched_results = prefetcher.take(serial_number)
+    if prefetched_results is not None:
+        for table_result in prefetched_results:
+            yield table_result
+        return
+
+    # With a cached result to fall back on, serve it on the first failure rather than waiting for retries
+    cached_results = result_cache.get(serial_number)
+    retry_attempts = None if cached_results is None else 0
+
+    # Each table is retried on a new connection if the previous one failed
+    state = {"cnxn": None}
+
+    def fetch_table(table):
+        if state["cnxn"] is None:
+            state["cnxn"] = connect_db()
+        try:
+            return get_db_table_info(table, serial_number, state["cnxn"].cursor())
+        except pyodbc.Error:
+            close_db(state["cnxn"])
+            state["cnxn"] = None
+            raise
+
+    logger.info("query_beacon_tables: Retrieving T3Production database information for %s", serial_number)
+    table_results = []
+    try:
+        for table in db_table_list:
+            try:
+                rows = db_access.call(lambda: fetch_table(table), retry_attempts)
+            except pyodbc.Error:
+                if cached_results is None:
+                    raise
+
+                # Serve the remaining tables from the last successful lookup
+                logger.error("query_beacon_tables: T3Production unavailable, serving cached %s", serial_number)
+                db_access.count("stale_served")
+                refresh_cached_beacon_async(serial_number)
+                for cached_result in cached_results[len(table_results):]:
+                    yield cached_result._replace(source="stale cache")
+                return
+
+            table_result = TableResult(table, rows, "T3Production", datetime.datetime.now())
+            table_results.append(table_result)
+            yield table_result
+    finally:
+        close_db(state["cnxn"])
+
+    result_cache.put(serial_number, table_results)
+
+
+def refresh_cached_beacon_async(serial_number):
+    """
+        This function retries the lookup of a beacon which was served from the
+        result cache in a background thread, with the full retry budget, and
+        updates the cache once T3Production answers.
+    :param serial_number: Serial number of beacon to refresh
+    :return: The started thread
+    """
+    def query():
+        cnxn = connect_db()
+        try:
+            db_cursor = cnxn.cursor()
+            return [TableResult(table, get_db_table_info(table, serial_number, db_cursor), "T3Production",
+                                datetime.datetime.now()) for table in db_table_list]
+        finally:
+            close_db(cnxn)
+
+    def worker():
+        try:
+            result_cache.put(serial_number, db_access.call(query))
+            logger.info("refresh_cached_beacon_async: refreshed cached %s", serial_number)
+        except pyodbc.Error as err:
+            logger.info("refresh_cached_beacon_async: unable to refresh %s: %s", serial_number, err)
+
+    thread = threading.Thread(target=worker, name="refresh-{0}".format(serial_number))
+    thread.daemon = True
+    thread.start()
+
+    return thread
+
 
-    # Get column names
-    logger.info("get_db_table_info: retrieving {0} column names".format(db_table))
-    db_col_names = []
-    for row in db_cursor.columns(table=db_table):
-        db_col_names.append(row.column_name)
-    logger.debug("get_db_table_info: -> DB Table Columns={0}".format(db_col_names))
+def close_db(cnxn):
+    if cnxn is None:
+        return
+    try:
+        cnxn.close()
+    except pyodbc.Error:
+        pass
 
-    # Generate dictionaries for the retrieved DB table entries
-    logger.info("get_db_table_info: building {0} entry dictionary list".format(db_table))
-    db_dict_list = []
-    for entry in db_entries:
 
-        # Add table name to dictionary
-        db_dict = {"db_table": db_table}
+def merge_table_results(table_results):
+    """
+        This function merges the per-table results, which are each already
+        ordered by transactionTime, into a single stream ordered by
+        transactionTime. Records with the same transactionTime keep the order
+        of db_table_list and of their table. All of the table_results are read
+        before the first record is produced; results pages are instead filled
+        in table by table by fetch_beacon_tables_async().
+    :param table_results: Iterable of TableResult tuples
+    :return: Generator of records ordered by transactionTime
+    """
+    def decorate(table_index, rows):
+        for row_index, row in enumerate(rows):
+            yield row["transactionTime"], table_index, row_index, row
+
+    streams = [decorate(table_index, result.rows) for table_index, result in enumerate(table_results)]
+
+    for entry in heapq.merge(*streams):
+        yield entry[3]
 
-        # Add retrieved data for DB table to dictionary
-        for index in range(len(db_col_names)):
-            col = db_col_names[index]
-            db_dict[col] = entry[index]
-        db_dict_list.append(db_dict)
-        logger.debug("get_db_table_info: -> DB Dict={0}".format(db_dict))
 
-    return db_dict_list
+def build_render_entries(entries, serial_number, node_labels=None):
+    """
+        This function builds the render model for the results tree from a
+        list of records. It formats every label and resolves employee names
+        and failure descriptions, so it should be run off the UI thread; the
+        ResultsPage then only has to create the tree items.
+    :param entries: Records or dictionaries
+    :param serial_number: Serial number the page is for
+    :param node_labels: Sub-assembly labels for genealogy results
+    :return: List of RenderEntry
+    """
+    render_entries = []
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+    for entry in entries:
+        if debug_enabled:
+            logger.debug("build_render_entries: add entry %s", entry)
+
+        db_table_str = format_db_table_str(entry["db_table"])
+        if node_labels is not None:
+            entry_sn = entry[get_serial_number_column(entry["db_table"])]
+            if entry_sn != serial_number:
+                db_table_str = "{0} [{1} {2}]".format(db_table_str, node_labels.get(entry_sn, ""), entry_sn)
+
+        children = []
+        expanded = False
+
+        # Add all of the keys for the selected DB table
+        for key in sorted(entry):
+            if key in ["db_table", "transactionID", "transactionTime", "serialNumber"]:
+                pass
+            elif key == "employeeID":
+                # Retrieve Employee Name to display
+                children.append(RenderNode(format_column_str(key), [RenderNode(get_employee_name(entry[key]), [],
+                                                                               False)], False))
+            elif key == "failureCode":
+                if entry["failureCode"] == 0 or entry["failureCode"] is None:
+                    pass
+                else:
+                    failure_str = "{0}: {1}".format(str(entry[key]), get_failure_description(entry[key]))
+                    children.append(RenderNode(format_column_str(key), [RenderNode(failure_str, [], False)], True))
+                    expanded = True
+            elif key == "failureDescription":
+                if entry["failureDescription"] == "Pass" or entry["failureDescription"] is None:
+                    pass
+                else:
+                    # Format failureDescription String
+                    # Multiple strings can be entered, so these are split and then multiple entries
+                    # are made within the Failure Description Page.
+                    failure_nodes = [RenderNode(failure, [], False) for failure in str(entry[key]).split("\r\n")]
+                    children.append(RenderNode(format_column_str(key), failure_nodes, True))
+                    expanded = True
+            else:
+                children.append(RenderNode(format_column_str(key), [RenderNode(str(entry[key]), [], False)], False))
+
+        node = RenderNode("{0}: {1}".format(entry["transactionTime"], db_table_str), children, expanded)
+
+        # Generate DF data values
+        df_values = None
+        if entry["db_table"] == "DFTestingTable":
+            df_values = [str(entry[channel]).upper() if channel in entry else "N/A" for channel in df_channel_list]
+
+        render_entries.append(RenderEntry(entry["transactionTime"], node, df_values, entry))
+
+    return render_entries
+
+
+def save_text_report(file_path, serial_number, render_entries):
+    """
+        This function saves the results tree of a beacon as an indented text
+        report
+    :param file_path: Location to save file
+    :param serial_number: Serial number of the beacon
+    :param render_entries: RenderEntry list for the beacon
+    :return:
+    """
+    def write_node(f, node, depth):
+        f.write("{0}{1}\n".format("    " * depth, node.label))
+        for child in node.children:
+            write_node(f, child, depth + 1)
+
+    with open(file_path, "w") as f:
+        f.write("Serial Number: {0}\n\n".format(serial_number))
+        for render_entry in render_entries:
+            if render_entry.df_values is not None:
+                f.write("DF Values: {0}\n".format(", ".join("{0}={1}".format(channel, value) for channel, value in
+                                                           zip(df_channel_list, render_entry.df_values))))
+            write_node(f, render_entry.node, 0)
 
 
-def get_beacon_info(serial_number):
+def fetch_beacon_tables_async(serial_number, on_table, on_done):
     """
-        This function returns a list containing dictionaries which contain
-        information for different manufacturing steps.
+        This function retrieves the DB tables for the specified beacon in a
+        background thread. The callbacks are run on the UI thread through
+        wx.CallAfter.
     :param serial_number: Serial number of beacon to retrieve data for
-    :return: list of dictionaries containing manufacturing information
+    :param on_table: Called with each TableResult and its RenderEntry list as they are retrieved
+    :param on_done: Called with None once all tables are retrieved, or with an error string
+    :return: The started thread
+    """
+    def worker():
+        error_str = None
+        prefetcher.begin_foreground()
+        try:
+            for table_result in query_beacon_tables(serial_number):
+                render_entries = build_render_entries(table_result.rows, serial_number)
+                wx.CallAfter(on_table, table_result, render_entries)
+        except (pyodbc.Error, sqlite3.Error) as err:
+            logger.error("fetch_beacon_tables_async: unable to retrieve SN# %s: %s", serial_number, err)
+            error_str = "Unable to retrieve data from T3Production"
+        except Exception as err:
+            # Any other failure still has to finish the page rather than leave it loading
+            logger.exception("fetch_beacon_tables_async: unable to retrieve SN# %s", serial_number)
+            error_str = str(err) or err.__class__.__name__
+        finally:
+            prefetcher.end_foreground()
+            wx.CallAfter(on_done, error_str)
+
+    thread = threading.Thread(target=worker, name="fetch-{0}".format(serial_number))
+    thread.daemon = True
+    thread.start()
+
+    return thread
+
+
+def predict_serial_numbers(serial_number, previous_serial, count):
+    """
+        This function predicts the serial numbers scanned after serial_number.
+        Serial numbers are split into a prefix and a zero padded number, and
+        the step between scans is taken from the previous serial number when
+        it has the same prefix and is close, otherwise a step of 1 is used.
+    :param serial_number: Serial number just looked up
+    :param previous_serial: Serial number looked up before it, or None
+    :param count: Number of serial numbers to predict
+    :return: List of predicted serial numbers, empty if there is no numeric suffix
+    """
+    match = re.match(r"^(.*?)(\d+)$", serial_number)
+    if match is None:
+        return []
+    prefix, digits = match.groups()
+    number = int(digits)
+
+    step = 1
+    previous_match = re.match(r"^(.*?)(\d+)$", previous_serial or "")
+    if previous_match is not None and previous_match.group(1) == prefix and \
+            len(previous_match.group(2)) == len(digits):
+        previous_step = number - int(previous_match.group(2))
+        if previous_step is not 0 and abs(previous_step) <= prefetch_max_step:
+            step = previous_step
+
+    predicted = []
+    for i in range(1, count + 1):
+        if number + step * i < 0:
+            break
+        predicted.append("{0}{1:0{2}d}".format(prefix, number + step * i, len(digits)))
+
+    return predicted
+
+
+def tokenize_search_text(text):
+    """
+        This function splits text into the lower case alphanumeric tokens used
+        by the SearchIndex
+    """
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def format_age(timestamp):
+    """
+        This function returns a short description of how long ago timestamp was
+    :param timestamp: datetime.datetime in local time
+    :return: String such as "5 min ago"
+    """
+    seconds = max(0, int((datetime.datetime.now() - timestamp).total_seconds()))
+
+    if seconds < 60:
+        return "{0} s ago".format(seconds)
+    elif seconds < 3600:
+        return "{0} min ago".format(seconds // 60)
+    elif seconds < 86400:
+        return "{0} h ago".format(seconds // 3600)
+    else:
+        return "{0} days ago".format(seconds // 86400)
+
+
+def run_async(func, on_done, name):
+    """
+        This function runs func in a background thread and passes its result to
+        on_done(result, error_str) on the UI thread.
+    :param func: Function to run, called with no arguments
+    :param on_done: Callback for the result, error_str is None on success
+    :param name: Thread name
+    :return: The started thread
+    """
+    def worker():
+        try:
+            result = func()
+        except pyodbc.Error as err:
+            logger.error("run_async: %s failed: %s", name, err)
+            wx.CallAfter(on_done, None, "Unable to retrieve data from T3Production")
+        except Exception as err:
+            # Report any other failure too, rather than leaving the caller waiting
+            logger.exception("run_async: %s failed", name)
+            wx.CallAfter(on_done, None, str(err) or err.__class__.__name__)
+        else:
+            wx.CallAfter(on_done, result, None)
+
+    thread = threading.Thread(target=worker, name=name)
+    thread.daemon = True
+    thread.start()
+
+    return thread
+
+
+def parse_serial_numbers(text):
+    """
+        This function splits a block of scanned or pasted text into a list of
+        unique, upper case serial numbers, keeping the input order
+    :param text: Serial numbers separated by whitespace or commas
+    :return: List of serial numbers
+    """
+    serial_numbers = []
+    seen = set()
+    for serial_number in text.replace(",", " ").upper().split():
+        if serial_number not in seen:
+            seen.add(serial_number)
+            serial_numbers.append(serial_number)
+
+    return serial_numbers
+
+
+def get_df_batch_info(serial_numbers):
+    """
+        This function returns the DFTestingTable entries for a batch of beacons
+    :param serial_numbers: List of serial numbers
+    :return: ColumnarTable of DFTestingTable entries
+    """
+    def query():
+        cnxn = connect_db()
+        try:
+            return get_db_table_info_batch("DFTestingTable", serial_numbers, cnxn.cursor(), columnar=True)
+        finally:
+            close_db(cnxn)
+
+    return db_access.call(query)
+
+
+def get_beacon_genealogy(serial_number, max_depth=None):
     """
+        This function retrieves the history of a unit and of the sub-assembly
+        boards linked to it in the assemblyKittingTable. The genealogy is
+        walked level by level: the histories of every serial number in a level
+        are fetched with one batched query per DB table, and the kitting rows in
+        those results give the next level. Serial numbers which have already
+        been visited are not fetched again.
+    :param serial_number: Top-level serial number of the unit
+    :param max_depth: Maximum number of levels below the unit to follow
+    :return: (records ordered by transactionTime, dict of serial number to label)
+    """
+    if max_depth is None:
+        max_depth = genealogy_max_depth
+
+    node_labels = {serial_number: "Unit"}
+    table_rows = dict((table, []) for table in db_table_list)
+
+    def query(level):
+        cnxn = connect_db()
+        try:
+            db_cursor = cnxn.cursor()
+            return dict((table, get_db_table_info_batch(table, level, db_cursor)) for table in db_table_list)
+        finally:
+            close_db(cnxn)
+
+    level = [serial_number]
+    depth = 0
+    while len(level) is not 0:
+        logger.info("get_beacon_genealogy: level %s -> %s serial numbers", depth, len(level))
+        level_rows = db_access.call(lambda: query(level))
+
+        next_level = []
+        for table in db_table_list:
+            table_rows[table].extend(level_rows[table])
+
+        if depth < max_depth:
+            for kitting_entry in level_rows["assemblyKittingTable"]:
+                for column, label in genealogy_link_columns:
+                    child_sn = kitting_entry.get(column)
+                    if child_sn is None:
+                        continue
+
+                    child_sn = str(child_sn).strip().upper()
+                    if child_sn and child_sn not in node_labels:
+                        node_labels[child_sn] = label
+                        next_level.append(child_sn)
+
+        level = next_level
+        depth += 1
+
+    table_results = [TableResult(table, sorted(table_rows[table], key=itemgetter("transactionTime")),
+                                 "T3Production", datetime.datetime.now()) for table in db_table_list]
+
+    return list(merge_table_results(table_results)), node_labels
+
+
+def df_value_to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def df_column_to_array(values):
+    """
+        This function converts a column of DF values to a float array, missing
+        and non-numeric values become NaN
+    :param values: List of DF values
+    :return: NumPy float array
+    """
+    try:
+        return numpy.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return numpy.fromiter((df_value_to_float(value) for value in values), dtype=float, count=len(values))
+
+
+def analyze_df_values(df_table):
+    """
+        This function computes the DF value statistics for a batch of
+        DFTestingTable entries
+    :param df_table: ColumnarTable of DFTestingTable entries
+    :return: DfAnalysis for the batch
+    """
+    logger.info("analyze_df_values: analysing %s DF rows", len(df_table))
+
+    if len(df_table) is 0:
+        values = numpy.empty((0, len(df_channel_list)))
+        return DfAnalysis([], [], values)
 
-    # Connect to database
-    logger.info("get_beacon_info: Connecting to T3Production database")
-    cnxn = pyodbc.connect(sql_cnxn_str)
-    cursor = cnxn.cursor()
+    values = numpy.column_stack([df_column_to_array(df_table.column(channel)) for channel in df_channel_list])
 
-    # Get information from the database for the specified serial number
-    logger.info("get_beacon_info: Retrieving T3Production database information for {0}".format(serial_number))
-    db_info = []
-    for table in db_table_list:
-        table_info = get_db_table_info(table, serial_number, cursor)
+    return DfAnalysis(df_table.column("serialNumber"), df_table.column("transactionTime"), values)
 
-        # Append all entries from the DB table to the db_info list
-        for index in range(len(table_info)):
-            db_info.append(table_info[index])
 
-    logger.info("get_beacon_info: Sorting retrieved data by transactionTime")
-    sorted_db_info = sorted(db_info, key=itemgetter("transactionTime"))
+def save_df_analysis_csv(file_path, analysis):
+    """
+        This function saves the DF values of a DfAnalysis to a CSV file, with
+        the outlier channels for each row. The summary statistics are saved to
+        a second file with "_summary" appended to the name.
+    :param file_path: Location to save file
+    :param analysis: DfAnalysis to save
+    :return:
+    """
+    logger.debug("save_df_analysis_csv: saving %s rows to %s", len(analysis), file_path)
+
+    with open(file_path, "wb") as f:
+        writer = csv.writer(f)
+        writer.writerow(["serialNumber", "transactionTime"] + df_channel_list + ["outliers"])
+        for index in xrange(len(analysis)):
+            writer.writerow([analysis.serial_numbers[index], analysis.transaction_times[index]] +
+                            ["" if numpy.isnan(value) else repr(value) for value in analysis.values[index]] +
+                            [" ".join(analysis.outlier_channels(index))])
 
-    return sorted_db_info
+    summary_path = "{0}_summary{1}".format(*os.path.splitext(file_path))
+    with open(summary_path, "wb") as f:
+        writer = csv.writer(f)
+        writer.writerow(["statistic"] + df_channel_list)
+        for label, stat_values in analysis.stat_rows():
+            writer.writerow([label] + [repr(float(value)) for value in stat_values])
 
 
-def save_json_file(file_path, serial_number):
+def save_json_file(file_path, serial_number, beacon_data):
     """
         This function parses and formats the database information for the
         specified beacon and then saves it in the format of a JSON file.
     :param file_path: Location to save file
     :param serial_number: Serial number of beacon to save
+    :param beacon_data: Records to save, as displayed on the results page
     :return:
     """
+    logger.debug("save_json_file: saving %s", serial_number)
 
-    logger.debug("save_json_file: retrieving data for {0}".format(serial_number))
-
-    data = get_beacon_info(serial_number)
+    data = [table_entry.to_dict() if isinstance(table_entry, BeaconRecord) else dict(table_entry)
+            for table_entry in beacon_data]
 
     # Change datetime.datetime objects to strings
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     for table_entry in data:
-        table_entry['scanTime'] = str(table_entry['scanTime'])
-        table_entry['transactionTime'] = str(table_entry['transactionTime'])
+        for key, value in table_entry.items():
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                table_entry[key] = str(value)
 
-        logger.debug("save_json_file: scan_time={0}, transaction_time={1}".format(table_entry["scanTime"],
-                                                                                  table_entry["transactionTime"]))
+        if debug_enabled:
+            logger.debug("save_json_file: scan_time=%s, transaction_time=%s", table_entry.get("scanTime"),
+                         table_entry["transactionTime"])
 
     with open(file_path, "w") as f:
         json.dump(data, f)
 
 
+def encode_column(values):
+    """
+        This function encodes the values of a column for a columnar export
+        file, choosing the column type from the values. Decimals are stored as
+        float64 and columns with mixed types as text.
+    :param values: List of column values
+    :return: (column type, has NULLs, payload bytes)
+    """
+    value_types = set(type(value) for value in values if value is not None)
+    has_nulls = None in values
+
+    if len(value_types) is 0:
+        col_type = "s"
+    elif value_types <= {datetime.datetime, datetime.date}:
+        col_type = "t"
+    elif value_types == {bool}:
+        col_type = "b"
+    elif value_types <= {int, long}:
+        col_type = "i"
+    elif value_types <= {int, long, float, decimal.Decimal}:
+        col_type = "f"
+    elif value_types == {str}:
+        col_type = "r"
+    else:
+        col_type = "s"
+
+    payload = []
+    if has_nulls:
+        payload.append(str(bytearray(value is None for value in values)))
+
+    if col_type == "t":
+        def to_microseconds(value):
+            if not isinstance(value, datetime.datetime):
+                value = datetime.datetime.combine(value, datetime.time())
+            delta = value - BCOL_EPOCH
+            return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+        payload.append(struct.pack("<{0}q".format(len(values)),
+                                   *[0 if value is None else to_microseconds(value) for value in values]))
+    elif col_type in ("i", "b"):
+        payload.append(struct.pack("<{0}q".format(len(values)), *[value or 0 for value in values]))
+    elif col_type == "f":
+        payload.append(struct.pack("<{0}d".format(len(values)), *[float(value or 0) for value in values]))
+    else:
+        if col_type == "r":
+            encoded = values
+        else:
+            encoded = [None if value is None else
+                       (value.decode("utf-8", "replace") if isinstance(value, str) else unicode(value)).encode("utf-8")
+                       for value in values]
+        payload.append(struct.pack("<{0}i".format(len(values)),
+                                   *[-1 if value is None else len(value) for value in encoded]))
+        payload.extend(value for value in encoded if value is not None)
+
+    return col_type, has_nulls, "".join(payload)
+
+
+def decode_column(col_type, has_nulls, row_count, payload):
+    """
+        This function decodes a column chunk written by encode_column()
+    :return: List of column values
+    """
+    nulls = None
+    offset = 0
+    if has_nulls:
+        nulls = bytearray(payload[:row_count])
+        offset = row_count
+
+    if col_type in ("t", "i", "b", "f"):
+        values = list(struct.unpack_from("<{0}{1}".format(row_count, "d" if col_type == "f" else "q"), payload,
+                                         offset))
+        if col_type == "t":
+            values = [BCOL_EPOCH + datetime.timedelta(microseconds=value) for value in values]
+        elif col_type == "b":
+            values = [bool(value) for value in values]
+    else:
+        lengths = struct.unpack_from("<{0}i".format(row_count), payload, offset)
+        offset += 4 * row_count
+        values = []
+        for length in lengths:
+            if length < 0:
+                values.append(None)
+            else:
+                value = payload[offset:offset + length]
+                values.append(value if col_type == "r" else value.decode("utf-8"))
+                offset += length
+
+    if nulls is not None:
+        values = [None if is_null else value for value, is_null in izip(values, nulls)]
+
+    return values
+
+
+def export_lot_columnar(file_path, serial_numbers):
+    """
+        This function exports all of the DB table entries for a lot of beacons
+        to a columnar export file. Each table is queried in batches of
+        batch_query_size serial numbers and written as the batches arrive.
+    :param file_path: Location to save file
+    :param serial_numbers: List of serial numbers to export
+    :return: Number of rows written
+    """
+    logger.info("export_lot_columnar: exporting %s serial numbers to %s", len(serial_numbers), file_path)
+
+    def query(db_table, batch):
+        cnxn = connect_db()
+        try:
+            return get_db_table_info_batch(db_table, batch, cnxn.cursor(), columnar=True)
+        finally:
+            close_db(cnxn)
+
+    writer = ColumnarFileWriter(file_path)
+    try:
+        for db_table in db_table_list:
+            for start in range(0, len(serial_numbers), batch_query_size):
+                batch = serial_numbers[start:start + batch_query_size]
+                writer.write_table(db_access.call(lambda: query(db_table, batch)))
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    return writer.row_count
+
+
+def benchmark_record_memory(num_rows=10000):
+    """
+        This function compares the memory used per row by the plain dictionary,
+        compact record and columnar representations of a DB table. The column
+        layout mirrors a typical test station table.
+    :param num_rows: Number of synthetic rows to build
+    :return: Dictionary of bytes per row for each representation
+    """
+    columns = ("transactionID", "transactionTime", "serialNumber", "employeeID", "workstationID", "scanTime",
+               "failureCode", "failureDescription", "stepResults")
+    start_time = datetime.datetime(2015, 1, 1)
+    rows = [(index, start_time + datetime.timedelta(seconds=index), "T3{0:06d}".format(index), 12, 3,
+             start_time + datetime.timedelta(seconds=index), 0, "Pass", "OK") for index in xrange(num_rows)]
+
+    record_class = type("benchmarkTableRecord", (BeaconRecord,), {"__slots__": columns,
+                                                                  "db_table": "benchmarkTable",
+                                                                  "fields": columns,
+                                                                  "field_set": frozenset(columns)})
+
+    # Only the containers are counted, the column values are shared by all three
+    dicts = []
+    for row in rows:
+        db_dict = {"db_table": "benchmarkTable"}
+        db_dict.update(izip(columns, row))
+        dicts.append(db_dict)
+    dict_bytes = sys.getsizeof(dicts) + sum(sys.getsizeof(db_dict) for db_dict in dicts)
+
+    records = [record_class(row) for row in rows]
+    record_bytes = sys.getsizeof(records) + sum(sys.getsizeof(record) for record in records)
+
+    table = ColumnarTable(record_class, rows)
+    columnar_bytes = sys.getsizeof(table.columns) + sum(sys.getsizeof(col) for col in table.columns.values())
+
+    results = {"dict": float(dict_bytes) / num_rows,
+               "record": float(record_bytes) / num_rows,
+               "columnar": float(columnar_bytes) / num_rows}
+
+    for name in ("dict", "record", "columnar"):
+        print "{0:<10} {1:8.1f} bytes/row".format(name, results[name])
+
+    return results
+
+
 def main():
     """
         This function starts the main application and displays the wxPython
         GUI
     :return:
     """
+    if "--bench-memory" in sys.argv:
+        benchmark_record_memory()
+        return
+
     app = wx.App()
     MainWindow(None)
-    app.MainLoop()
+    try:
+        app.MainLoop()
+    finally:
+        # Write any queued log records before exiting
+        log_listener.stop()
 
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,120 @@
+import datetime
+import decimal
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    import wx
+    import pyodbc
+except ImportError:
+    gbs = None
+else:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import get_beacon_status as gbs
+
+
+def make_table(db_table, fields, rows):
+    record_class = type(db_table + "Record", (gbs.BeaconRecord,), {"__slots__": fields, "db_table": db_table,
+                                                                  "fields": fields,
+                                                                  "field_set": frozenset(fields)})
+    return gbs.ColumnarTable(record_class, rows)
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class ColumnEncodingTest(unittest.TestCase):
+
+    def round_trip(self, values):
+        col_type, has_nulls, payload = gbs.encode_column(values)
+        return col_type, gbs.decode_column(col_type, has_nulls, len(values), payload)
+
+    def test_timestamps(self):
+        values = [datetime.datetime(2016, 3, 1, 8, 30, 15, 123456), None, datetime.datetime(1969, 12, 31, 23, 59)]
+        self.assertEqual(self.round_trip(values), ("t", values))
+
+    def test_dates_are_returned_as_timestamps(self):
+        col_type, decoded = self.round_trip([datetime.date(2016, 3, 1)])
+        self.assertEqual((col_type, decoded), ("t", [datetime.datetime(2016, 3, 1)]))
+
+    def test_integers_and_bits(self):
+        self.assertEqual(self.round_trip([1, None, -2 ** 63, 2 ** 63 - 1, 0]), ("i", [1, None, -2 ** 63,
+                                                                                      2 ** 63 - 1, 0]))
+        self.assertEqual(self.round_trip([True, False, None]), ("b", [True, False, None]))
+
+    def test_numbers_are_stored_as_floats(self):
+        self.assertEqual(self.round_trip([decimal.Decimal("1.25"), 2, None, 0.5]), ("f", [1.25, 2.0, None, 0.5]))
+
+    def test_text(self):
+        self.assertEqual(self.round_trip(["Pass", "", None]), ("r", ["Pass", "", None]))
+        self.assertEqual(self.round_trip([u"caf\xe9", "WS1", None]), ("s", [u"caf\xe9", u"WS1", None]))
+        self.assertEqual(self.round_trip([None, None]), ("s", [None, None]))
+
+    def test_mixed_types_are_stored_as_text(self):
+        self.assertEqual(self.round_trip([1, "A"]), ("s", [u"1", u"A"]))
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class ColumnarFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "lot.bcol")
+        self.row_group_size = gbs.export_row_group_size
+        gbs.export_row_group_size = 3
+
+    def tearDown(self):
+        gbs.export_row_group_size = self.row_group_size
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        start_time = datetime.datetime(2016, 3, 1, 8, 0)
+        fields = ("transactionID", "transactionTime", "serialNumberUnit", "failureCode", "failureDescription")
+        kitting_rows = [(i, start_time + datetime.timedelta(minutes=i), "BC{0:04d}".format(i % 3), i % 2 or None,
+                         u"Antenna\r\nNo-fix" if i % 2 else "Pass") for i in range(10)]
+        df_fields = ("transactionID", "transactionTime", "serialNumber", "df1")
+        df_rows = [(i, start_time + datetime.timedelta(hours=i), "BC{0:04d}".format(i % 3), decimal.Decimal("0.5"))
+                   for i in range(4)]
+
+        writer = gbs.ColumnarFileWriter(self.file_path)
+        writer.write_table(make_table("assemblyKittingTable", fields, kitting_rows[:6]))
+        writer.write_table(make_table("DFTestingTable", df_fields, df_rows))
+        writer.write_table(make_table("assemblyKittingTable", fields, kitting_rows[6:]))
+        writer.close()
+        self.assertEqual(writer.row_count, 14)
+
+        reader = gbs.ColumnarFileReader(self.file_path)
+        self.assertEqual(reader.serial_numbers(), ["BC0000", "BC0001", "BC0002"])
+        self.assertGreater(len(reader.row_groups), 2)
+
+        records = reader.read_beacon("BC0001")
+        expected = [dict(zip(fields, row), db_table="assemblyKittingTable") for row in kitting_rows
+                    if row[2] == "BC0001"]
+        expected += [dict(zip(df_fields, row), db_table="DFTestingTable", df1=0.5) for row in df_rows
+                     if row[2] == "BC0001"]
+        expected.sort(key=lambda record: record["transactionTime"])
+        self.assertEqual(records, expected)
+        self.assertEqual(reader.read_beacon("BC9999"), [])
+
+        columns = reader.read_columns("DFTestingTable")
+        self.assertEqual(list(columns), list(df_fields))
+        self.assertEqual(sorted(columns["transactionID"]), [0, 1, 2, 3])
+
+    def test_incomplete_file_is_rejected(self):
+        writer = gbs.ColumnarFileWriter(self.file_path)
+        writer.write_table(make_table("DFTestingTable", ("transactionID", "transactionTime", "serialNumber"),
+                                      [(1, datetime.datetime(2016, 3, 1), "BC0001")]))
+        writer.flush_table("DFTestingTable")
+        writer.f.close()
+
+        self.assertRaises(ValueError, gbs.ColumnarFileReader, self.file_path)
+
+    def test_abort_removes_file(self):
+        writer = gbs.ColumnarFileWriter(self.file_path)
+        writer.abort()
+        self.assertFalse(os.path.exists(self.file_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
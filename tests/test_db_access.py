@@ -0,0 +1,220 @@
+import datetime
+import os
+import sys
+import unittest
+
+try:
+    import wx
+    import pyodbc
+except ImportError:
+    gbs = None
+else:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import get_beacon_status as gbs
+
+
+def transient_error():
+    return pyodbc.OperationalError("08S01", "Communication link failure")
+
+
+class FailingCall(object):
+    """
+        Callable which raises the queued errors before returning "ok"
+    """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.call_count = 0
+
+    def __call__(self):
+        self.call_count += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = gbs.CircuitBreaker(3, 30)
+
+    def open_breaker(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def expire_reset(self):
+        self.breaker.opened_at -= self.breaker.reset_s
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, gbs.CircuitBreaker.CLOSED)
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, gbs.CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, gbs.CircuitBreaker.CLOSED)
+
+    def test_single_half_open_trial(self):
+        self.open_breaker()
+        self.expire_reset()
+
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, gbs.CircuitBreaker.HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, gbs.CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        self.open_breaker()
+        self.expire_reset()
+
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, gbs.CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class DbAccessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = (gbs.db_retry_attempts, gbs.db_retry_base_delay_s, gbs.db_breaker_failure_threshold)
+        gbs.db_retry_attempts = 3
+        gbs.db_retry_base_delay_s = 0
+        gbs.db_breaker_failure_threshold = 2
+        self.db_access = gbs.DbAccess()
+
+    def tearDown(self):
+        gbs.db_retry_attempts, gbs.db_retry_base_delay_s, gbs.db_breaker_failure_threshold = self.settings
+
+    def test_transient_errors_are_retried(self):
+        func = FailingCall(transient_error(), transient_error())
+        self.assertEqual(self.db_access.call(func), "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(self.db_access.stats["calls"], 1)
+        self.assertEqual(self.db_access.stats["retries"], 2)
+        self.assertEqual(self.db_access.stats["failures"], 0)
+
+    def test_retries_are_limited(self):
+        func = FailingCall(*[transient_error() for _ in range(5)])
+        self.assertRaises(pyodbc.Error, self.db_access.call, func, 1)
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(self.db_access.stats["retries"], 1)
+        self.assertEqual(self.db_access.stats["failures"], 1)
+
+    def test_other_errors_are_not_retried(self):
+        func = FailingCall(pyodbc.ProgrammingError("42S02", "Invalid object name"))
+        self.assertRaises(pyodbc.Error, self.db_access.call, func)
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(self.db_access.stats["retries"], 0)
+
+    def test_open_breaker_fails_fast(self):
+        for _ in range(2):
+            self.assertRaises(pyodbc.Error, self.db_access.call, FailingCall(transient_error()), 0)
+
+        func = FailingCall()
+        self.assertRaises(gbs.DbUnavailableError, self.db_access.call, func)
+        self.assertEqual(func.call_count, 0)
+        self.assertEqual(self.db_access.stats["fast_fails"], 1)
+
+    def test_exception_ends_half_open_trial(self):
+        breaker = self.db_access.breaker
+        for _ in range(2):
+            breaker.record_failure()
+        breaker.opened_at -= breaker.reset_s
+
+        self.assertRaises(AttributeError, self.db_access.call, FailingCall(AttributeError("employeeName")))
+        self.assertEqual(breaker.state, gbs.CircuitBreaker.OPEN)
+        self.assertFalse(breaker.trial_running)
+
+        # The next trial is let through once the reset period has passed again
+        breaker.opened_at -= breaker.reset_s
+        self.assertEqual(self.db_access.call(FailingCall()), "ok")
+        self.assertEqual(breaker.state, gbs.CircuitBreaker.CLOSED)
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class StaleResultTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((name, getattr(gbs, name)) for name in (
+            "connect_db", "refresh_cached_beacon_async", "db_access", "result_cache", "prefetcher", "local_mirror",
+            "db_retry_attempts", "db_retry_base_delay_s"))
+        self.connect_count = 0
+        self.refreshed = []
+
+        def connect_db():
+            self.connect_count += 1
+            raise transient_error()
+
+        gbs.connect_db = connect_db
+        gbs.refresh_cached_beacon_async = self.refreshed.append
+        gbs.db_access = gbs.DbAccess()
+        gbs.result_cache = gbs.ResultCache(10)
+        gbs.prefetcher = gbs.Prefetcher()
+        gbs.local_mirror = None
+        gbs.db_retry_attempts = 3
+        gbs.db_retry_base_delay_s = 0
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(gbs, name, value)
+
+    def test_cached_result_is_served_without_retries(self):
+        retrieved_at = datetime.datetime(2016, 3, 1, 8, 30)
+        cached_results = [gbs.TableResult(table, [], "T3Production", retrieved_at) for table in gbs.db_table_list]
+        gbs.result_cache.put("BC0001", cached_results)
+
+        table_results = list(gbs.query_beacon_tables("BC0001"))
+        self.assertEqual([table_result.db_table for table_result in table_results], gbs.db_table_list)
+        self.assertEqual(set(table_result.source for table_result in table_results), {"stale cache"})
+        self.assertEqual(table_results[0].retrieved_at, retrieved_at)
+
+        self.assertEqual(self.connect_count, 1)
+        self.assertEqual(gbs.db_access.stats["retries"], 0)
+        self.assertEqual(gbs.db_access.stats["stale_served"], 1)
+        self.assertEqual(self.refreshed, ["BC0001"])
+
+    def test_uncached_lookup_is_retried(self):
+        self.assertRaises(pyodbc.Error, list, gbs.query_beacon_tables("BC0002"))
+        self.assertEqual(self.connect_count, 4)
+        self.assertEqual(gbs.db_access.stats["retries"], 3)
+        self.assertEqual(self.refreshed, [])
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class LookupFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((name, getattr(gbs, name)) for name in (
+            "fetch_one", "db_access", "local_mirror", "employee_name_cache", "failure_description_cache"))
+        gbs.fetch_one = lambda sql_query: None
+        gbs.db_access = gbs.DbAccess()
+        gbs.local_mirror = None
+        gbs.employee_name_cache = {}
+        gbs.failure_description_cache = {}
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(gbs, name, value)
+
+    def test_unknown_ids_are_not_cached(self):
+        self.assertEqual(gbs.get_employee_name(7), "7")
+        self.assertEqual(gbs.get_failure_description(42), "Unknown")
+        self.assertEqual(gbs.employee_name_cache, {})
+        self.assertEqual(gbs.failure_description_cache, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
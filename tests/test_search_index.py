@@ -0,0 +1,81 @@
+import datetime
+import os
+import sys
+import unittest
+
+try:
+    import wx
+    import pyodbc
+except ImportError:
+    gbs = None
+else:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import get_beacon_status as gbs
+
+
+def make_records(serial_number, failure_code):
+    transaction_time = datetime.datetime(2016, 3, 1, 8, 30)
+    return [{"db_table": "falloutTable", "transactionID": 1, "transactionTime": transaction_time,
+             "serialNumberUnit": serial_number, "employeeID": 7, "workstationID": "WS1",
+             "failureCode": failure_code, "failureDescription": "Antenna open"}]
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class ResultsNotebookSearchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = wx.App(False)
+
+    def setUp(self):
+        self.saved = dict((name, getattr(gbs, name)) for name in ("employee_name_cache",
+                                                                  "failure_description_cache", "search_index"))
+
+        # Avoid T3Production lookups while building the pages
+        gbs.employee_name_cache = {7: "Jane Smith"}
+        gbs.failure_description_cache = {42: "Antenna", 43: "Antenna"}
+        gbs.search_index = gbs.SearchIndex()
+
+        self.frame = wx.Frame(None)
+        self.notebook = gbs.ResultsNotebook(self.frame)
+        self.notebook.set_max_live_pages(1)
+
+    def tearDown(self):
+        self.frame.Destroy()
+        for name, value in self.saved.items():
+            setattr(gbs, name, value)
+
+    def add_page(self, serial_number, failure_code):
+        page = gbs.ResultsPage(self.notebook, make_records(serial_number, failure_code), serial_number)
+        self.notebook.AddPage(page, serial_number)
+        self.notebook.touch_page(page)
+        gbs.search_index.add_entries(page.render_entries)
+        return page
+
+    def test_evicted_page_stays_searchable(self):
+        first_page = self.add_page("BC0001", 42)
+        self.add_page("BC0002", 43)
+
+        # The empty page is at index 0, the first results page has been evicted
+        self.assertIsInstance(self.notebook.GetPage(1), gbs.ResultsPlaceholder)
+        results = gbs.search_index.search("code:42")
+        self.assertEqual([render_entry.entry["serialNumberUnit"] for render_entry in results], ["BC0001"])
+        self.assertIs(results[0], first_page.render_entries[0])
+
+        # Rebuilding the page keeps it in the index
+        page = self.notebook.touch_page(self.notebook.GetPage(1))
+        self.assertIsInstance(page, gbs.ResultsPage)
+        self.assertEqual(len(gbs.search_index.search("antenna")), 2)
+        self.assertTrue(page.select_render_entry(results[0]))
+
+    def test_closed_page_is_removed(self):
+        self.add_page("BC0001", 42)
+        self.add_page("BC0002", 43)
+
+        self.notebook.DeletePage(2)
+        self.assertEqual(len(gbs.search_index.search("code:43")), 0)
+        self.assertEqual(len(gbs.search_index.search("code:42")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import datetime
+import os
+import sqlite3
+import sys
+import unittest
+
+try:
+    import wx
+    import pyodbc
+except ImportError:
+    gbs = None
+else:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import get_beacon_status as gbs
+
+
+class SqliteCursor(object):
+    """
+        Cursor with pyodbc's calling convention over an SQLite connection
+    """
+
+    def __init__(self, cnxn):
+        self.cursor = cnxn.cursor()
+
+    def execute(self, sql_query, *params):
+        self.cursor.execute(sql_query, params)
+        return self
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self.cursor.fetchmany(size)
+
+
+class SqliteConnection(object):
+
+    def __init__(self, cnxn):
+        self.cnxn = cnxn
+
+    def cursor(self):
+        return SqliteCursor(self.cnxn)
+
+    def close(self):
+        pass
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class SerialArrayTest(unittest.TestCase):
+
+    def test_indexing(self):
+        serials = gbs.SerialArray(iter(["BC0001", "BC02", "", "BC000003"]))
+        self.assertEqual(len(serials), 4)
+        self.assertEqual(list(serials), ["BC0001", "BC02", "", "BC000003"])
+        self.assertEqual(serials[1], "BC02")
+        self.assertEqual(serials[3], "BC000003")
+
+    def test_empty(self):
+        self.assertEqual(len(gbs.SerialArray()), 0)
+        self.assertEqual(list(gbs.SerialArray()), [])
+
+
+@unittest.skipIf(gbs is None, "wxPython and pyodbc are required")
+class SerialNumberIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((name, getattr(gbs, name)) for name in ("connect_db", "db_access",
+                                                                  "serial_index_fetch_size"))
+        self.cnxn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+        self.cnxn.execute("CREATE TABLE assemblyKittingTable (transactionID INTEGER, transactionTime timestamp, "
+                          "serialNumberUnit TEXT)")
+        self.transaction_id = 0
+
+        gbs.connect_db = lambda: SqliteConnection(self.cnxn)
+        gbs.db_access = gbs.DbAccess()
+        gbs.serial_index_fetch_size = 2
+        self.index = gbs.SerialNumberIndex()
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(gbs, name, value)
+        self.cnxn.close()
+
+    def add_rows(self, *serial_numbers):
+        transaction_time = datetime.datetime(2016, 3, 1, 8, 0) + datetime.timedelta(minutes=self.transaction_id)
+        for serial_number in serial_numbers:
+            self.transaction_id += 1
+            self.cnxn.execute("INSERT INTO assemblyKittingTable VALUES (?, ?, ?)",
+                              (self.transaction_id, transaction_time, serial_number))
+
+    def test_merge_skips_duplicates(self):
+        self.index.merge([gbs.SerialArray(["BC0001", "BC0003"]), gbs.SerialArray(["BC0002", "BC0003"])])
+        self.index.merge([gbs.SerialArray(["BC0001", "BC0004"]), gbs.SerialArray()])
+        self.assertEqual(list(self.index.serials), ["BC0001", "BC0002", "BC0003", "BC0004"])
+
+    def test_membership_and_prefix_matches(self):
+        self.index.merge([gbs.SerialArray(["BC0001", "BC0010", "BC0011", "BC0100", "BD0001"])])
+
+        self.assertIn("BC0010", self.index)
+        self.assertNotIn("BC001", self.index)
+        self.assertNotIn("BE0001", self.index)
+
+        self.assertEqual(self.index.prefix_matches("BC001"), ["BC0010", "BC0011"])
+        self.assertEqual(self.index.prefix_matches("BC0", limit=2), ["BC0001", "BC0010"])
+        self.assertEqual(self.index.prefix_matches("BD"), ["BD0001"])
+        self.assertEqual(self.index.prefix_matches("BE"), [])
+        self.assertEqual(self.index.prefix_matches("C"), [])
+
+    def test_refresh_dedups_across_chunks(self):
+        self.add_rows("BC0002", "bc0001 ", "BC0002", "BC0001", None, "BC0003", "BC0002")
+        self.index.refresh()
+        self.assertEqual(list(self.index.serials), ["BC0001", "BC0002", "BC0003"])
+        self.assertEqual(self.index.last_id, 7)
+        self.assertTrue(self.index.is_loaded())
+
+    def test_refresh_reads_past_watermark(self):
+        self.add_rows("BC0001", "BC0002")
+        self.index.refresh()
+
+        # Nothing is queried while the watermark has not moved
+        self.assertEqual(self.index.refresh(), 0)
+
+        self.add_rows("BC0002", "BC0004")
+        self.assertEqual(self.index.refresh(), 2)
+        self.assertEqual(list(self.index.serials), ["BC0001", "BC0002", "BC0004"])
+        self.assertEqual(self.index.last_id, 4)
+
+    def test_watermark(self):
+        db_cursor = SqliteCursor(self.cnxn)
+        self.assertIsNone(gbs.get_table_watermark("assemblyKittingTable", db_cursor))
+
+        # SQLite returns MAX(transactionTime) as text
+        self.add_rows("BC0001", "BC0002")
+        last_time, last_id = gbs.get_table_watermark("assemblyKittingTable", db_cursor)
+        self.assertEqual((str(last_time), last_id), ("2016-03-01 08:00:00", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()